@@ -5,6 +5,10 @@ from sqlalchemy import pool
 from sqlmodel import SQLModel
 from app.models.author import *
 from app.models.book import *
+from app.models.book_stats import *
+from app.models.effective_price import *
+from app.models.idempotency_key import *
+from app.models.cart import *
 from app.models.category import *
 from app.models.discount import *
 from app.models.order import *
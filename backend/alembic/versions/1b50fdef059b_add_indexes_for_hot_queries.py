@@ -0,0 +1,38 @@
+"""add indexes for hot queries
+
+Revision ID: 1b50fdef059b
+Revises: 267964c59862
+Create Date: 2026-10-18 13:40:51.208391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b50fdef059b'
+down_revision: Union[str, None] = '267964c59862'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_book_category_id'), 'book', ['category_id'], unique=False)
+    op.create_index(op.f('ix_book_author_id'), 'book', ['author_id'], unique=False)
+    op.create_index('ix_discount_book_id_dates', 'discount', ['book_id', 'discount_start_date', 'discount_end_date'], unique=False)
+    op.create_index(op.f('ix_order_user_id'), 'order', ['user_id'], unique=False)
+    op.create_index('ix_review_book_id_review_date', 'review', ['book_id', 'review_date'], unique=False)
+    op.create_index('ix_review_book_id_rating_star', 'review', ['book_id', 'rating_star'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_book_id_rating_star', table_name='review')
+    op.drop_index('ix_review_book_id_review_date', table_name='review')
+    op.drop_index(op.f('ix_order_user_id'), table_name='order')
+    op.drop_index('ix_discount_book_id_dates', table_name='discount')
+    op.drop_index(op.f('ix_book_author_id'), table_name='book')
+    op.drop_index(op.f('ix_book_category_id'), table_name='book')
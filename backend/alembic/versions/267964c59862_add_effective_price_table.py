@@ -0,0 +1,59 @@
+"""add effective_price table
+
+Revision ID: 267964c59862
+Revises: fb2669d90511
+Create Date: 2026-10-18 11:02:17.431876
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '267964c59862'
+down_revision: Union[str, None] = 'fb2669d90511'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('effective_price',
+    sa.Column('book_id', sa.BigInteger(), nullable=False),
+    sa.Column('discount_id', sa.BigInteger(), nullable=True),
+    sa.Column('final_price', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('sub_price', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.ForeignKeyConstraint(['discount_id'], ['discount.id'], ),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    op.create_index('ix_effective_price_final_price', 'effective_price', ['final_price', 'book_id'], unique=False)
+    op.create_index('ix_effective_price_onsale', 'effective_price', [sa.text('sub_price DESC'), 'final_price', 'book_id'], unique=False)
+    # Backfill with today's prices, the app refreshes them at every day boundary
+    op.execute("""
+        INSERT INTO effective_price (book_id, discount_id, final_price, sub_price)
+        SELECT p.id, p.discount_id,
+               COALESCE(d.discount_price, p.book_price),
+               ROUND(p.book_price - COALESCE(d.discount_price, p.book_price), 2)
+        FROM (
+            SELECT b.id, b.book_price, (
+                SELECT d.id FROM discount d
+                WHERE d.book_id = b.id
+                  AND d.discount_start_date <= CURRENT_DATE
+                  AND (d.discount_end_date IS NULL OR d.discount_end_date >= CURRENT_DATE)
+                ORDER BY d.discount_price, d.id
+                LIMIT 1
+            ) AS discount_id
+            FROM book b
+        ) p
+        LEFT JOIN discount d ON d.id = p.discount_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_effective_price_onsale', table_name='effective_price')
+    op.drop_index('ix_effective_price_final_price', table_name='effective_price')
+    op.drop_table('effective_price')
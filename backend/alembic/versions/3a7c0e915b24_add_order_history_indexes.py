@@ -0,0 +1,32 @@
+"""add order history indexes
+
+Revision ID: 3a7c0e915b24
+Revises: e5a92c7f3d18
+Create Date: 2026-10-18 23:41:05.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c0e915b24'
+down_revision: Union[str, None] = 'e5a92c7f3d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_order_user_id', table_name='order')
+    op.create_index('ix_order_user_id_order_date', 'order', ['user_id', 'order_date', 'id'], unique=False)
+    op.create_index(op.f('ix_orderitem_order_id'), 'orderitem', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_orderitem_order_id'), table_name='orderitem')
+    op.drop_index('ix_order_user_id_order_date', table_name='order')
+    op.create_index('ix_order_user_id', 'order', ['user_id'], unique=False)
@@ -0,0 +1,39 @@
+"""add full text search indexes
+
+Revision ID: 87eda45a2a5d
+Revises: 1b50fdef059b
+Create Date: 2026-10-18 15:27:09.663402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '87eda45a2a5d'
+down_revision: Union[str, None] = '1b50fdef059b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite deployments search with the in-process index instead
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index('ix_book_search', 'book',
+                    [sa.text("to_tsvector('english', coalesce(book_title, '') || ' ' || coalesce(book_summary, ''))")],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_author_search', 'author',
+                    [sa.text("to_tsvector('english', author_name)")],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_author_search', table_name='author')
+    op.drop_index('ix_book_search', table_name='book')
@@ -0,0 +1,28 @@
+"""add book_stats avg_rating index
+
+Revision ID: 9d4f6b2a8c13
+Revises: 3a7c0e915b24
+Create Date: 2026-10-19 09:12:47.604311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f6b2a8c13'
+down_revision: Union[str, None] = '3a7c0e915b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_book_stats_avg_rating', 'book_stats', ['avg_rating', 'book_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_stats_avg_rating', table_name='book_stats')
@@ -0,0 +1,36 @@
+"""add cart_item table
+
+Revision ID: b83f0d5e61c2
+Revises: 4c1e7a9d2b36
+Create Date: 2026-10-18 19:05:12.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83f0d5e61c2'
+down_revision: Union[str, None] = '4c1e7a9d2b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cart_item',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('book_id', sa.BigInteger(), nullable=False),
+    sa.Column('quantity', sa.SmallInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'book_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cart_item')
@@ -0,0 +1,34 @@
+"""extend review indexes for keyset paging
+
+Revision ID: e5a92c7f3d18
+Revises: b83f0d5e61c2
+Create Date: 2026-10-18 20:12:37.209416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a92c7f3d18'
+down_revision: Union[str, None] = 'b83f0d5e61c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_review_book_id_review_date', table_name='review')
+    op.drop_index('ix_review_book_id_rating_star', table_name='review')
+    op.create_index('ix_review_book_id_review_date', 'review', ['book_id', 'review_date', 'id'], unique=False)
+    op.create_index('ix_review_book_id_rating_star', 'review', ['book_id', 'rating_star', 'review_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_book_id_rating_star', table_name='review')
+    op.drop_index('ix_review_book_id_review_date', table_name='review')
+    op.create_index('ix_review_book_id_rating_star', 'review', ['book_id', 'rating_star'], unique=False)
+    op.create_index('ix_review_book_id_review_date', 'review', ['book_id', 'review_date'], unique=False)
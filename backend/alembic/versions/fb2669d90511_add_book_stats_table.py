@@ -0,0 +1,52 @@
+"""add book_stats table
+
+Revision ID: fb2669d90511
+Revises: 8dc1d11fc0bd
+Create Date: 2026-10-18 09:12:40.115204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fb2669d90511'
+down_revision: Union[str, None] = '8dc1d11fc0bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_stats',
+    sa.Column('book_id', sa.BigInteger(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('avg_rating', sa.Float(), nullable=True),
+    sa.Column('star_1', sa.Integer(), nullable=False),
+    sa.Column('star_2', sa.Integer(), nullable=False),
+    sa.Column('star_3', sa.Integer(), nullable=False),
+    sa.Column('star_4', sa.Integer(), nullable=False),
+    sa.Column('star_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    # Backfill from the existing reviews
+    op.execute("""
+        INSERT INTO book_stats (book_id, review_count, rating_sum, avg_rating, star_1, star_2, star_3, star_4, star_5)
+        SELECT book_id, COUNT(id), SUM(rating_star), CAST(AVG(rating_star) AS FLOAT),
+               SUM(CASE WHEN rating_star = 1 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating_star = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating_star = 3 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating_star = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating_star = 5 THEN 1 ELSE 0 END)
+        FROM review
+        GROUP BY book_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('book_stats')
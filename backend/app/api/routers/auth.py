@@ -4,10 +4,10 @@ from fastapi import APIRouter, Form, HTTPException, Request, status, Depends, Re
 from fastapi.security import OAuth2PasswordRequestForm
 import jwt
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, create_refresh_token
+from app.core.security import create_access_token, create_refresh_token
 from app.dependencies.auth import authenticate_user, get_current_user, get_user
-from sqlmodel import Session
-from app.db.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.database import get_async_session
 from app.models.user import User
 from app.schemas.auth import LoginResponse, RefreshResponse
 
@@ -17,11 +17,11 @@ router = APIRouter()
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     response: Response,
-    session: Session = Depends(get_session)   
+    session: AsyncSession = Depends(get_async_session)   
 ):
     """Authenticate user and return JWT token."""
     user = await authenticate_user(form_data.username, form_data.password, session)
-    if not user or not verify_password(form_data.password, user.password):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -30,11 +30,11 @@ async def login_for_access_token(
         
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id, "admin": user.admin}, expires_delta=access_token_expires
     )
     refresh_token_expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
     refresh_token = create_refresh_token(
-        data={"sub": user.email}, expires_delta=refresh_token_expires
+        data={"sub": user.email, "uid": user.id, "admin": user.admin}, expires_delta=refresh_token_expires
     )
 
     return LoginResponse(access_token=access_token, refresh_token=refresh_token, token_type="bearer", user=user)
@@ -45,7 +45,7 @@ async def refresh_access_token(
     request: Request,
     response: Response,
     refresh_token: str = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     # refresh_token = request.cookies.get("refresh_token")
 
@@ -66,7 +66,7 @@ async def refresh_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     new_access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id, "admin": user.admin}, expires_delta=access_token_expires
     )
     return RefreshResponse(
         access_token=new_access_token,
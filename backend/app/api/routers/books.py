@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
-from sqlmodel import Session
-from ...db.database import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ...db.database import get_read_session, get_write_session
 from ...models.book import Book
-from ...schemas.book import BookCreate, BookUpdate
-from ...crud.book import create_book, get_book, get_books, update_book, delete_book
+from ...schemas.book import BookCreate, BookUpdate, HomeShelves
+from ...schemas.bulk import BulkResult
+from ...models.user import User
+from ...core.bulk import parse_bulk_body
+from ...core.cache import catalog_cache
+from ...core.config import settings
+from ...core.home_shelves import home_shelves
+from ...core.responses import FastJSONResponse
+from ...core.search_index import book_search_index
+from ...dependencies.auth import get_current_user
+from ...crud.book import build_home_shelves, bulk_write_books, create_book, get_book, get_books, search_books, update_book, delete_book
 from enum import Enum
 
 class SortBy(str, Enum):
@@ -14,51 +23,108 @@ class SortBy(str, Enum):
     price_asc = "price_asc"
     price_desc = "price_desc"
 
+class TotalMode(str, Enum):
+    """Enum for how the listing total is computed."""
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
 router = APIRouter()
 
 @router.get("/")
 async def read_books(
+    request: Request,
     response: Response,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1),
     sort_by: SortBy = Query(SortBy.recommended),
     category_id: int = Query(None),
     author_id: int = Query(None),
-    min_rating: int = Query(None)
+    min_rating: int = Query(None),
+    cursor: str = Query(None, description="next_cursor of the previous page, replaces skip"),
+    total: TotalMode = Query(TotalMode.exact, description="Skip or approximate the total for infinite scroll, cursor pages leave an exact total out")
 ):
     """
     Get a list of books with optional filters and pagination.
     """
-    books = get_books(
+    books = await catalog_cache.conditional_read(
+        request,
+        response,
+        get_books,
         session,
         skip,
         limit,
         sort_by,
         category_id,
         author_id,
-        min_rating
+        min_rating,
+        cursor,
+        total
     )
     if not books:
         raise HTTPException(status_code=404, detail="No books found")
+    if isinstance(books, Response):
+        return books
+
+    return FastJSONResponse(books, headers=response.headers)
+
+@router.get("/home", response_model=HomeShelves)
+async def read_home_shelves(session: AsyncSession = Depends(get_read_session)):
+    """
+    Get the on-sale, recommended and popular shelves of the home page.
+    """
+    shelves = home_shelves.get()
+    if shelves is None:
+        # Only until the background refresher finished its first build
+        generation = home_shelves.freshness.generation
+        shelves = await session.run_sync(build_home_shelves)
+        home_shelves.set(shelves, generation)
+    return shelves
 
-    return books
+@router.get("/search")
+async def search_books_by_text(
+    q: str = Query(..., min_length=1, max_length=200),
+    session: AsyncSession = Depends(get_read_session),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Search books by title, summary and author name, best matches first.
+    """
+    if session.bind.dialect.name != "postgresql":
+        # Rebuild a stale in-memory index here, a rebuild inside run_sync would hold up concurrent searches
+        await book_search_index.refresh(session)
+    return await session.run_sync(search_books, q, skip, limit)
 
 @router.get("/{book_id}", response_model=Book)
-async def read_book(book_id: int, session: Session = Depends(get_session)):
+async def read_book(book_id: int, session: AsyncSession = Depends(get_read_session)):
     """Get a book by ID."""
-    book = get_book(session, book_id)
+    book = await session.run_sync(get_book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     return book
 
+@router.post("/bulk", response_model=BulkResult)
+async def create_books_in_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_write_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create or replace many books from a JSON array or an NDJSON body (application/x-ndjson).
+    Rows with an id replace that book, errors are reported per row index.
+    """
+    rows, errors = parse_bulk_body(await request.body(), request.headers.get("content-type", ""), settings.BULK_MAX_ROWS)
+    return await session.run_sync(bulk_write_books, rows, errors, current_user)
+
 @router.post("/{book_id}", response_model=Book, status_code=status.HTTP_201_CREATED)
-async def create_book_by_id(book_create: BookCreate, session: Session = Depends(get_session)):
+async def create_book_by_id(book_create: BookCreate, session: AsyncSession = Depends(get_write_session)):
     """
     Create a new book.
     """
-    book = create_book(
-        session,
+    book = await session.run_sync(
+        create_book,
         book_create=book_create
     )
     return book
@@ -67,26 +133,26 @@ async def create_book_by_id(book_create: BookCreate, session: Session = Depends(
 async def update_book_by_id(
     book_update: BookUpdate,
     book_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_write_session),
     
 ):
     """
     Create a new book.
     """
-    book = update_book(
-        session,
+    book = await session.run_sync(
+        update_book,
         book_id=book_id,
         book_update=book_update
     )
     return "Book updated successfully"
 
 @router.delete("/{book_id}")
-async def delete_book_by_id(book_id: int, session: Session = Depends(get_session)):
+async def delete_book_by_id(book_id: int, session: AsyncSession = Depends(get_write_session)):
     """
     Delete a book by ID.
     """
-    book = delete_book(
-        session,
+    book = await session.run_sync(
+        delete_book,
         book_id=book_id
     )
     if not book:
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from ...core.cache import catalog_cache
+
+router = APIRouter()
+
+@router.get("/stats")
+async def read_cache_stats():
+    """Get hit/miss counters of the catalog cache."""
+    return catalog_cache.stats()
@@ -1,20 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, SQLModel
-from typing import Dict, List
-from pydantic import BaseModel
-from ...db.database import get_session
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List
+from ...db.database import get_async_session
+from ...core.cart_store import MAX_QUANTITY, cart_store
+from ...crud.cart import quote_cart
 from ...models.book import Book
 from ...models.user import User
 from ...dependencies.auth import get_current_user
+from ...schemas.cart import CartQuote
 
 router = APIRouter()
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
-
-# In-memory cart storage (for demo purposes; use a database in production)
-user_carts: Dict[int, List[Dict]] = {}
-
 class CartItem(SQLModel):
     book_id: int
     quantity: int
@@ -22,37 +19,27 @@ class CartItem(SQLModel):
 @router.post("/add", response_model=None)
 async def add_to_cart(
     item: CartItem,
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
-    book = session.get(Book, item.book_id)
+    book = await session.get(Book, item.book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    if item.quantity < 1 or item.quantity > 8:
-        raise HTTPException(status_code=400, detail="Quantity must be between 1 and 8")
-    
-
-    # Get current user
-    user = await get_current_user(token, session)
-    if not user:
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
-    
-    # Initialize cart for user if not exists
-    if user.id not in user_carts:
-        user_carts[user.id] = []
-
-    # Check if book is already in cart
-    for cart_item in user_carts[user.id]:
-        if cart_item["book_id"] == item.book_id:
-            cart_item["quantity"] += item.quantity
-            if cart_item["quantity"] > 8:
-                raise HTTPException(status_code=400, detail="Total quantity cannot exceed 8")
-            return {"msg": "Updated cart"}
+    if item.quantity < 1 or item.quantity > MAX_QUANTITY:
+        raise HTTPException(status_code=400, detail=f"Quantity must be between 1 and {MAX_QUANTITY}")
 
-    # Add new item to cart
-    user_carts[user.id].append({"book_id": item.book_id, "quantity": item.quantity, "book": book})
+    quantity = await session.run_sync(cart_store.add, user.id, item.book_id, item.quantity)
+    if quantity > item.quantity:
+        return {"msg": "Updated cart"}
     return {"msg": "Added to cart"}
     
-@router.get("/")
-async def get_cart(user: User = Depends(get_current_user)):
-    return user_carts.get(user.id, [])
+@router.get("/", response_model=List[CartItem])
+async def get_cart(user: User = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    cart = await session.run_sync(cart_store.get, user.id)
+    return [CartItem(book_id=book_id, quantity=quantity) for book_id, quantity in cart.items()]
+
+@router.get("/quote", response_model=CartQuote)
+async def get_cart_quote(user: User = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    """Price the cart with current effective prices, as placing the order would charge it."""
+    cart = await session.run_sync(cart_store.get, user.id)
+    return await session.run_sync(quote_cart, cart)
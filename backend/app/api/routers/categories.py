@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from ...db.database import get_session
+from ...db.database import get_read_session
 from ...models.category import Category
+from ...crud.category import get_categories as get_categories_list
+from ...core.cache import catalog_cache
 
 router = APIRouter()
 @router.get("/", response_model=List[Category])
-async def get_categories(session: Session = Depends(get_session)):
+async def get_categories(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
     """Get all categories."""
-    categories = session.exec(select(Category).order_by(Category.category_name.asc())).all()
-    return categories
\ No newline at end of file
+    categories = await catalog_cache.conditional_read(request, response, get_categories_list, session)
+    return categories
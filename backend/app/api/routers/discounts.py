@@ -1,55 +1,75 @@
-from fastapi import APIRouter, Depends, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from ...db.database import get_session
+from ...db.database import get_read_session, get_write_session
 from ...models.discount import Discount
 from ...schemas.discount import DiscountCreate, DiscountUpdate, DiscountRead
-from ...crud.discount import create_discount, get_discount, get_discounts, update_discount, delete_discount
+from ...schemas.bulk import BulkResult
+from ...crud.discount import bulk_write_discounts, create_discount, get_discount, get_discounts, update_discount, delete_discount
 from ...models.user import User
+from ...core.bulk import parse_bulk_body
+from ...core.cache import catalog_cache
+from ...core.config import settings
+from ...core.responses import FastJSONResponse
 from ...dependencies.auth import get_current_user
 
 router = APIRouter()
 @router.get("/", response_model=List[Discount])
-async def read_discounts(session: Session = Depends(get_session)):
+async def read_discounts(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
     """Get all discounts."""
-    discounts = get_discounts(
+    discounts = await catalog_cache.conditional_read(
+        request,
+        response,
+        get_discounts,
         session
     )
-    return discounts
+    if isinstance(discounts, Response):
+        return discounts
+    return FastJSONResponse(discounts, headers=response.headers)
 @router.get("/{book_id}", response_model=Discount)
-async def read_discount(book_id: int, session: Session = Depends(get_session)):
+async def read_discount(book_id: int, session: AsyncSession = Depends(get_read_session)):
     """Get discount by ID."""
-    discount = get_discount(session, book_id)
+    discount = await session.run_sync(get_discount, book_id)
     return discount
 
 @router.post("/", response_model=DiscountRead, status_code=status.HTTP_201_CREATED)
 async def create_discount_endpoint(
     discount_create: DiscountCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_write_session),
     current_user: User = Depends(get_current_user)
 ):
     """Create discount."""
-    discount = create_discount(
-        session,
+    discount = await session.run_sync(
+        create_discount,
         discount_create,
         current_user=current_user
     )
     return discount
 
+@router.post("/bulk", response_model=BulkResult)
+async def create_discounts_in_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_write_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Create or replace many discounts from a JSON array or an NDJSON body, errors are reported per row index."""
+    rows, errors = parse_bulk_body(await request.body(), request.headers.get("content-type", ""), settings.BULK_MAX_ROWS)
+    return await session.run_sync(bulk_write_discounts, rows, errors, current_user)
+
 @router.put("/{discount_id}", response_model=DiscountRead)
 async def update_discount_by_id(
     discount_id: int, 
     discount_update: DiscountUpdate,
     current_user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ) -> DiscountRead:
     """Update a  discount."""
-    discount = update_discount(session, discount_id, discount_update, current_user)
+    discount = await session.run_sync(update_discount, discount_id, discount_update, current_user)
 
     return discount
 
 @router.delete("/{discount_id}")
-async def delete_discount_by_id(discount_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+async def delete_discount_by_id(discount_id: int, session: AsyncSession = Depends(get_write_session), current_user: User = Depends(get_current_user)):
     """Delete discount by id."""
-    delete_discount(session, discount_id, current_user)
+    await session.run_sync(delete_discount, discount_id, current_user)
     return {"message": "Discount deleted successfully"}
\ No newline at end of file
@@ -1,51 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from typing import List
+import asyncio
+import hashlib
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 
 from ...dependencies.auth import get_current_user
-from ...db.database import get_session
+from ...db.database import get_async_session, get_write_session
 from ...models.user import User
 from ...schemas.order import OrderRead, OrderCreate, OrderUpdate
-from ...crud.order import get_orders, get_order, place_order, update_order, delete_order
+from ...schemas.response import OrdersResponse
+from ...core.config import settings
+from ...crud.order import get_orders, get_order, get_user_orders, place_order, update_order, delete_order
+from ...crud.idempotency_key import claim_idempotency_key, release_idempotency_key
 
 router = APIRouter()
 
 @router.get("/")
-async def read_orders(session: Session = Depends(get_session), skip: int = 0, limit: int = 10) -> List[OrderRead]:
+async def read_orders(session: AsyncSession = Depends(get_async_session), skip: int = 0, limit: int = 10) -> List[OrderRead]:
     """Get all books."""
-    orders = get_orders(session)
+    orders = await session.run_sync(get_orders, skip, limit)
     return orders
 
+@router.get("/me", response_model=OrdersResponse)
+async def read_my_orders(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str = Query(None, description="next_cursor of the previous page")
+):
+    """Get the current user's orders with their items, newest first."""
+    return await session.run_sync(get_user_orders, current_user.id, limit, cursor)
+
 @router.get("/{order_id}")
-async def read_order(order_id: int, session: Session = Depends(get_session)) -> OrderRead:
+async def read_order(order_id: int, session: AsyncSession = Depends(get_async_session)) -> OrderRead:
     """Get a book."""
-    order = get_order(session, order_id)
+    order = await session.run_sync(get_order, order_id)
     return order
 
-@router.post("/", response_model=List[OrderRead], status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED)
 async def cart_place_order(
     order_create: OrderCreate, 
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_write_session),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
-    """Place order."""
-    order = place_order(
-        session,
-        order_create,
-        current_user=current_user
-    )
-    return order
+    """Place order.
+
+    Retries sent with the same Idempotency-Key get the response of the first
+    request instead of placing the order again.
+    """
+    if idempotency_key is None:
+        return await session.run_sync(place_order, order_create, current_user=current_user)
+
+    request_hash = hashlib.sha256(order_create.model_dump_json().encode()).hexdigest()
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        record, claimed = await session.run_sync(claim_idempotency_key, current_user.id, idempotency_key, request_hash)
+        if claimed:
+            break
+        if record.status_code is not None:
+            return JSONResponse(record.response, status_code=record.status_code, headers={"Idempotent-Replayed": "true"})
+        # The first request is still running, wait for its response
+        if time.monotonic() > deadline:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(0.1)
+
+    try:
+        return await session.run_sync(place_order, order_create, current_user=current_user, idempotency_claim=record)
+    except BaseException:
+        await session.run_sync(release_idempotency_key, record)
+        raise
 
 @router.put("/{order_id}")
-async def update_order_by_id(order_id: int, order_update: OrderUpdate, session: Session = Depends(get_session)) -> OrderRead:
+async def update_order_by_id(order_id: int, order_update: OrderUpdate, session: AsyncSession = Depends(get_async_session)) -> OrderRead:
     """Update a  order."""
-    order = update_order(session, order_id, order_update)
+    order = await session.run_sync(update_order, order_id, order_update)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
 @router.delete("/{order_id}")
-async def delete_order_by_id(order_id: int, session: Session = Depends(get_session)):
+async def delete_order_by_id(order_id: int, session: AsyncSession = Depends(get_async_session)):
     """Delete oder by id."""
-    order = delete_order(session, order_id)
+    order = await session.run_sync(delete_order, order_id)
     return {"message": "Order deleted successfully"}
\ No newline at end of file
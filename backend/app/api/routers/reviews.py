@@ -1,35 +1,63 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
-from app.db.database import get_session
-from ...crud.review import create_review, get_reviews, get_reviews_ratings
-from app.schemas.review import ReviewCreate, ReviewRead, RatingRead
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.database import get_read_session, get_write_session
+from ...crud.review import create_review, get_ratings_summaries, get_reviews, get_reviews_ratings
+from app.schemas.review import BookRatingSummary, ReviewCreate, ReviewRead, RatingRead
 from app.schemas.response import ReviewsResponse
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
+# Enough for a listing page, keeps the IN list small
+MAX_BATCH_BOOK_IDS = 100
+
+@router.get("/ratings", response_model=List[BookRatingSummary])
+async def get_ratings_by_book_ids(
+    book_ids: str = Query(..., description="Comma separated book ids"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Get the rating summary of many books, for listing cards.
+    """
+    try:
+        ids = [int(book_id) for book_id in book_ids.split(",") if book_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="book_ids must be comma separated integers")
+    if not ids or len(ids) > MAX_BATCH_BOOK_IDS:
+        raise HTTPException(status_code=400, detail=f"Give between 1 and {MAX_BATCH_BOOK_IDS} book ids")
+    return await session.run_sync(get_ratings_summaries, ids)
+
 @router.post("/{book_id}", response_model=ReviewRead)
-async def create_review_by_book_id(review_create: ReviewCreate, book_id: int, session: Session = Depends(get_session)):
+async def create_review_by_book_id(review_create: ReviewCreate, book_id: int, session: AsyncSession = Depends(get_write_session)):
     """
     Create a new review for a book.
     """
-    review = create_review(session, review_create, book_id)
+    review = await session.run_sync(create_review, review_create, book_id)
 
     return review
 
-@router.get("/{book_id}")
-async def get_reviews_by_book_id(book_id: int, rating: int = 0, sort_by: str = "newest to oldest", skip: int = 0, limit: int = 10, session: Session = Depends(get_session)):
-    reviews = get_reviews(session, book_id, rating, sort_by, skip, limit)
+@router.get("/{book_id}", response_model=ReviewsResponse)
+async def get_reviews_by_book_id(
+    book_id: int,
+    rating: int = 0,
+    sort_by: str = "newest to oldest",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1),
+    cursor: str = Query(None, description="next_cursor of the previous page, replaces skip"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    reviews = await session.run_sync(get_reviews, book_id, rating, sort_by, skip, limit, cursor)
     if not reviews:
         raise HTTPException(status_code=404, detail="No reviews found for this book")
-    return reviews
+    return FastJSONResponse(reviews)
 
 @router.get("/ratings/{book_id}", response_model=List[RatingRead])
-async def get_reviews_ratings_by_book_id(book_id: int, session: Session = Depends(get_session)):
+async def get_reviews_ratings_by_book_id(book_id: int, session: AsyncSession = Depends(get_read_session)):
     """
     Get ratings for a book.
     """
-    ratings = get_reviews_ratings(session, book_id)
+    ratings = await session.run_sync(get_reviews_ratings, book_id)
     if not ratings:
         raise HTTPException(status_code=404, detail="No ratings found for this book")
     return ratings
\ No newline at end of file
@@ -0,0 +1,134 @@
+import json
+import logging
+from itertools import islice
+from typing import Any, Callable, List, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, SQLModel, insert, update
+
+from app.schemas.bulk import BulkResult, BulkRowError
+
+logger = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# Per-row problems found against the database, such as a missing foreign key, an empty list writes the row
+RowProblems = Callable[[Any], List[str]]
+
+# A chunk writer gets the valid rows of a chunk and returns (index, id, created) per written row and the row errors
+ChunkWriter = Callable[[Session, List[Tuple[int, Any]]], Tuple[List[Tuple[int, int, bool]], List[BulkRowError]]]
+
+def parse_bulk_body(body: bytes, content_type: str, max_rows: int) -> Tuple[List[Tuple[int, Any]], List[BulkRowError]]:
+    """Split a bulk request body into (index, row) pairs.
+
+    NDJSON bodies have one row per non-empty line, a line that is not JSON is
+    an error of its row. Any other body must be a JSON array.
+    """
+    rows, errors = [], []
+    if content_type.split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        for index, line in enumerate(lines):
+            try:
+                rows.append((index, json.loads(line)))
+            except ValueError as exc:
+                errors.append(BulkRowError(index=index, errors=[f"Invalid JSON: {exc}"]))
+    else:
+        try:
+            parsed = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(parsed, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        rows = list(enumerate(parsed))
+
+    count = len(rows) + len(errors)
+    if not count:
+        raise HTTPException(status_code=400, detail="No rows to write")
+    if count > max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {max_rows} rows per request")
+    return rows, errors
+
+def validate_rows(schema: Type[BaseModel], rows: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, Any]], List[BulkRowError]]:
+    """Validate raw rows against a schema, keeping the index of every row."""
+    valid, errors = [], []
+    for index, raw in rows:
+        try:
+            valid.append((index, schema.model_validate(raw)))
+        except ValidationError as exc:
+            errors.append(BulkRowError(index=index, errors=[
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                for error in exc.errors()
+            ]))
+    return valid, errors
+
+def insert_and_update(
+    session: Session,
+    model: Type[SQLModel],
+    rows: List[Tuple[int, Any]],
+    row_problems: RowProblems
+) -> Tuple[List[Tuple[int, int, bool]], List[BulkRowError]]:
+    """Insert the rows without an id and update the rows with one, rows with problems become errors.
+
+    Returns (index, id, created) per written row and the row errors, nothing is committed.
+    """
+    errors, inserts, updates = [], [], []
+    for index, row in rows:
+        problems = row_problems(row)
+        if problems:
+            errors.append(BulkRowError(index=index, errors=problems))
+        elif row.id is None:
+            inserts.append((index, row))
+        else:
+            updates.append((index, row))
+
+    written = []
+    if inserts:
+        # Batched on Postgres with the ids in row order, SQLite cannot order RETURNING and inserts row by row
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        new_ids = session.exec(statement, params=[row.model_dump(exclude={"id"}) for _, row in inserts]).scalars().all()
+        written += [(index, row_id, True) for (index, _), row_id in zip(inserts, new_ids)]
+    if updates:
+        # ORM bulk UPDATE by primary key
+        session.exec(update(model), params=[row.model_dump() for _, row in updates])
+        written += [(index, row.id, False) for index, row in updates]
+    return written, errors
+
+def write_in_chunks(
+    session: Session,
+    rows: List[Tuple[int, Any]],
+    errors: List[BulkRowError],
+    schema: Type[BaseModel],
+    write_chunk: ChunkWriter,
+    chunk_size: int
+) -> BulkResult:
+    """Validate and write rows chunk by chunk, every chunk in its own transaction.
+
+    `write_chunk` commits its rows. When the database rejects a chunk, it is
+    rolled back and its rows are reported as errors, the next chunks still run.
+    """
+    result = BulkResult(ids=[None] * (len(rows) + len(errors)), errors=list(errors))
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        valid, chunk_errors = validate_rows(schema, chunk)
+        result.errors.extend(chunk_errors)
+        if not valid:
+            continue
+        try:
+            written, chunk_errors = write_chunk(session, valid)
+        except SQLAlchemyError as exc:
+            session.rollback()
+            logger.warning("Bulk chunk of %d rows rejected: %s", len(valid), exc)
+            detail = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+            result.errors.extend(BulkRowError(index=index, errors=[f"Chunk not written: {detail}"]) for index, _ in valid)
+            continue
+        result.errors.extend(chunk_errors)
+        for index, row_id, created in written:
+            result.ids[index] = row_id
+            if created:
+                result.created += 1
+            else:
+                result.updated += 1
+    result.errors.sort(key=lambda error: error.index)
+    result.failed = len(result.errors)
+    return result
@@ -0,0 +1,194 @@
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from enum import Enum
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import inspect as sa_inspect
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.responses import render_json
+
+CacheKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+# Session.info flag of a session that must see the latest rows, its cached reads go to the database and refill the entry
+SKIP_CACHE = "skip_cache"
+
+class CacheEntry(NamedTuple):
+    expires_at: float
+    value: Any
+    etag: str
+    modified_at: float
+
+class ResponseCache:
+    """Bounded LRU cache with a TTL for catalog reads.
+
+    Entries are grouped by namespace and keyed by the normalized call
+    parameters, so writers can drop exactly the entries they affect.
+    The cache is per process, the TTL bounds how long other workers serve
+    data older than their last local write.
+
+    An entry's strong ETag is a hash of its JSON, so refills of unchanged
+    data and other workers holding the same data answer with the same ETag.
+    Last-Modified stays at the first fill that produced the current ETag.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, counter: str):
+        stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+        stats[counter] += 1
+
+    def entry(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Return the live entry of a key without counting a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                return entry
+            return None
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """Return (found, value) for a key, dropping it if it expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(key[0], "hits")
+                return True, entry.value
+            # An expired entry stays until its refill, which keeps its Last-Modified when the data is unchanged
+            self._count(key[0], "misses")
+            return False, None
+
+    def set(self, key: CacheKey, value: Any):
+        """Store a value, evicting the least recently used entries over the bound."""
+        if self.max_entries <= 0:
+            return
+        etag = f'"{hashlib.sha256(render_json(value)).hexdigest()[:32]}"'
+        with self._lock:
+            self.version += 1
+            previous = self._entries.get(key)
+            modified_at = previous.modified_at if previous is not None and previous.etag == etag else time.time()
+            self._entries[key] = CacheEntry(time.monotonic() + self.ttl_seconds, value, etag, modified_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str, match: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        """Drop the entries of a namespace, only those whose parameters satisfy `match` if given."""
+        with self._lock:
+            self.version += 1
+            for key in list(self._entries):
+                if key[0] == namespace and (match is None or match(dict(key[1]))):
+                    del self._entries[key]
+                    self._count(namespace, "invalidations")
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per namespace."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "namespaces": {namespace: dict(counters) for namespace, counters in self._stats.items()},
+            }
+
+    def cached(self, namespace: str):
+        """Cache a CRUD reader taking a session as its first argument."""
+        def decorator(function):
+            signature = inspect.signature(function)
+
+            def cache_key(*args, **kwargs) -> CacheKey:
+                """Key of a call, given its arguments without the session."""
+                bound = signature.bind(None, *args, **kwargs)
+                bound.apply_defaults()
+                params = tuple(
+                    (name, value.value if isinstance(value, Enum) else value)
+                    for name, value in bound.arguments.items()
+                    if name != "session"
+                )
+                return (namespace, params)
+
+            @functools.wraps(function)
+            def wrapper(session: Session, *args, **kwargs):
+                key = cache_key(*args, **kwargs)
+                if not session.info.get(SKIP_CACHE):
+                    found, value = self.get(key)
+                    if found:
+                        return value
+                value = function(session, *args, **kwargs)
+                _detach(session, value)
+                self.set(key, value)
+                return value
+
+            wrapper.cache_key = cache_key
+            return wrapper
+        return decorator
+
+    async def conditional_read(self, request: Request, response: Response, reader, session: AsyncSession, *args, **kwargs):
+        """Call a cached reader honouring If-None-Match / If-Modified-Since.
+
+        Answers 304 straight from the cache when the client copy is current,
+        otherwise returns the reader's value with ETag and Last-Modified set.
+        """
+        key = reader.cache_key(*args, **kwargs)
+        entry = None if session.info.get(SKIP_CACHE) else self.entry(key)
+        if entry is not None and _not_modified(request, entry):
+            return Response(status_code=304, headers=_validators(entry))
+        value = await session.run_sync(reader, *args, **kwargs)
+        entry = self.entry(key)
+        if entry is not None:
+            # The client may hold the same data from another worker or an earlier fill
+            if _not_modified(request, entry):
+                return Response(status_code=304, headers=_validators(entry))
+            response.headers.update(_validators(entry))
+        return value
+
+def _validators(entry: CacheEntry) -> Dict[str, str]:
+    # no-cache lets browsers keep the body but revalidate it on every use
+    return {
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.modified_at, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+def _not_modified(request: Request, entry: CacheEntry) -> bool:
+    """Whether the client's validators match a cache entry."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(entry.modified_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _detach(session: Session, value: Any):
+    """Expunge cached ORM rows so a later commit in the session cannot expire them."""
+    rows = value if isinstance(value, (list, tuple)) else [value]
+    for row in rows:
+        state = sa_inspect(row, raiseerr=False)
+        if state is not None and state.session is session:
+            session.expunge(row)
+
+catalog_cache = ResponseCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
@@ -0,0 +1,126 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Tuple
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.upsert import upsert_insert
+from app.models.cart import CartItem as CartItemModel
+
+MAX_QUANTITY = 8
+
+def _check_quantity(quantity: int):
+    if quantity > MAX_QUANTITY:
+        raise HTTPException(status_code=400, detail=f"Total quantity cannot exceed {MAX_QUANTITY}")
+
+class CartStore(ABC):
+    """Where carts live, each one a {book_id: quantity} mapping per user.
+
+    Methods take the request's session first like the CRUD functions, so
+    the router calls every backend the same way.
+    """
+
+    @abstractmethod
+    def get(self, session: Session, user_id: int) -> Dict[int, int]:
+        """Return the cart of a user."""
+
+    @abstractmethod
+    def add(self, session: Session, user_id: int, book_id: int, quantity: int) -> int:
+        """Add copies of a book to a cart and return the new quantity of that line."""
+
+class DatabaseCartStore(CartStore):
+    """Carts in the cart_item table, shared by every worker and kept across restarts."""
+
+    def get(self, session: Session, user_id: int) -> Dict[int, int]:
+        rows = session.exec(
+            select(CartItemModel.book_id, CartItemModel.quantity)
+            .where(CartItemModel.user_id == user_id)
+        ).all()
+        return dict(rows)
+
+    def add(self, session: Session, user_id: int, book_id: int, quantity: int) -> int:
+        insert_statement = upsert_insert(session)
+        if insert_statement is None:
+            return self._add_locally(session, user_id, book_id, quantity)
+
+        # One statement creates the line or adds to it, so concurrent first adds cannot collide
+        _check_quantity(quantity)
+        statement = insert_statement(CartItemModel).values(
+            user_id=user_id, book_id=book_id, quantity=quantity, updated_at=datetime.now(ZoneInfo("UTC"))
+        )
+        new_quantity = CartItemModel.quantity + statement.excluded.quantity
+        statement = statement.on_conflict_do_update(
+            index_elements=[CartItemModel.user_id, CartItemModel.book_id],
+            set_={CartItemModel.quantity: new_quantity, CartItemModel.updated_at: statement.excluded.updated_at},
+            where=new_quantity <= MAX_QUANTITY
+        ).returning(CartItemModel.quantity)
+        line_quantity = session.exec(statement).scalar_one_or_none()
+        if line_quantity is None:
+            # The line exists and the update was skipped by the quantity limit
+            session.rollback()
+            raise HTTPException(status_code=400, detail=f"Total quantity cannot exceed {MAX_QUANTITY}")
+        session.commit()
+        return line_quantity
+
+    def _add_locally(self, session: Session, user_id: int, book_id: int, quantity: int) -> int:
+        """Read, update and write back a cart line, for dialects without an upsert."""
+        line = session.get(CartItemModel, (user_id, book_id))
+        if line is None:
+            line = CartItemModel(user_id=user_id, book_id=book_id, quantity=0)
+        _check_quantity(line.quantity + quantity)
+        line.quantity += quantity
+        line.updated_at = datetime.now(ZoneInfo("UTC"))
+        session.add(line)
+        session.commit()
+        return line.quantity
+
+class MemoryCartStore(CartStore):
+    """Carts in process memory, for a single worker.
+
+    Carts left alone for `idle_seconds` are dropped, and the least recently
+    used ones go first once there are more than `max_carts`.
+    """
+
+    def __init__(self, idle_seconds: float, max_carts: int):
+        self.idle_seconds = idle_seconds
+        self.max_carts = max_carts
+        # Least recently used first, so expired carts are always at the front
+        self._carts: "OrderedDict[int, Tuple[float, Dict[int, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _touch(self, user_id: int) -> Dict[int, int]:
+        now = time.monotonic()
+        used_at, cart = self._carts.pop(user_id, (now, {}))
+        if now - used_at >= self.idle_seconds:
+            cart = {}
+        self._carts[user_id] = (now, cart)
+        # Only the front can be idle, stop at the first cart still in use
+        while self._carts and (len(self._carts) > self.max_carts or now - next(iter(self._carts.values()))[0] >= self.idle_seconds):
+            self._carts.popitem(last=False)
+        return cart
+
+    def get(self, session: Session, user_id: int) -> Dict[int, int]:
+        with self._lock:
+            return dict(self._touch(user_id))
+
+    def add(self, session: Session, user_id: int, book_id: int, quantity: int) -> int:
+        with self._lock:
+            cart = self._touch(user_id)
+            _check_quantity(cart.get(book_id, 0) + quantity)
+            cart[book_id] = cart.get(book_id, 0) + quantity
+            return cart[book_id]
+
+def create_cart_store() -> CartStore:
+    """Build the backend selected by CART_STORE."""
+    if settings.CART_STORE == "database":
+        return DatabaseCartStore()
+    if settings.CART_STORE == "memory":
+        return MemoryCartStore(settings.CART_IDLE_TTL_SECONDS, settings.CART_MAX_CARTS)
+    raise ValueError(f"Unknown CART_STORE {settings.CART_STORE!r}, expected 'database' or 'memory'")
+
+cart_store = create_cart_store()
@@ -26,5 +26,35 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = "0.1.0"
     PROJECT_DESCRIPTION: str = "A FastAPI project"
     DATABASE_URL: str
+    # Derived from DATABASE_URL (asyncpg / aiosqlite) when not set
+    ASYNC_DATABASE_URL: str | None = None
+    # Read-only copies of DATABASE_URL for catalog reads, as a JSON list
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    # Reads of a client that just wrote go to the primary for this long, keep it above the replication lag
+    READ_YOUR_WRITES_SECONDS: int = 5
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 4096
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = min(4, os.cpu_count() or 1)
+    # Logins waiting for a hashing worker beyond this are answered 503
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Log every statement, for local debugging only
+    SQL_ECHO: bool = False
+    SQL_SLOW_QUERY_MS: int = 200
+    SQL_REPEATED_QUERY_THRESHOLD: int = 10
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    # How long a retry waits for the first request with the same key to finish,
+    # a request still unfinished after twice as long is taken as abandoned
+    IDEMPOTENCY_WAIT_SECONDS: float = 10
+    # "database" works across workers, "memory" keeps carts in a single process
+    CART_STORE: str = "database"
+    CART_IDLE_TTL_SECONDS: int = 86400
+    CART_MAX_CARTS: int = 10000
+    # Rows of a bulk write validated and committed together
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_ROWS: int = 100000
     
 settings = Settings()
\ No newline at end of file
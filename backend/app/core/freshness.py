@@ -0,0 +1,32 @@
+import time
+
+class Freshness:
+    """Tracks whether something built from the database still reflects it.
+
+    Writers call invalidate(). A build only counts as fresh for the generation
+    it started in, and for max_age_seconds after it finished so writes of
+    other workers show up too.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._generation = 0
+        self._built_generation = -1
+        self._built_at = None
+
+    @property
+    def generation(self) -> int:
+        """Read before a build starts and pass to mark_built() once it finished."""
+        return self._generation
+
+    def invalidate(self):
+        self._generation += 1
+
+    def mark_built(self, generation: int):
+        self._built_at = time.monotonic()
+        self._built_generation = generation
+
+    def is_stale(self) -> bool:
+        if self._built_generation != self._generation or self._built_at is None:
+            return True
+        return time.monotonic() - self._built_at > self.max_age_seconds
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.freshness import Freshness
+
+logger = logging.getLogger(__name__)
+
+class HomeShelfCache:
+    """The home page shelves, built in the background and served from memory.
+
+    Writers call invalidate() and the refresher rebuilds the shelves within
+    poll_seconds; they are also rebuilt after max_age_seconds so writes from
+    other workers and discounts starting at midnight show up.
+    """
+
+    def __init__(self, max_age_seconds: float, poll_seconds: float = 1.0):
+        self.freshness = Freshness(max_age_seconds)
+        self.poll_seconds = poll_seconds
+        self._shelves = None
+
+    def invalidate(self):
+        """Rebuild the shelves on the next poll."""
+        self.freshness.invalidate()
+
+    def get(self) -> Optional[Any]:
+        """The latest shelves, None until the first build finished."""
+        return self._shelves
+
+    def set(self, shelves: Any, generation: int):
+        self._shelves = shelves
+        self.freshness.mark_built(generation)
+
+    async def run(self, build: Callable[[], Any]):
+        """Rebuild the shelves with a blocking `build` whenever they are stale, until cancelled."""
+        while True:
+            if self.freshness.is_stale():
+                generation = self.freshness.generation
+                try:
+                    self.set(await asyncio.to_thread(build), generation)
+                except Exception:
+                    logger.exception("Rebuilding the home shelves failed")
+            await asyncio.sleep(self.poll_seconds)
+
+home_shelves = HomeShelfCache(settings.CACHE_TTL_SECONDS)
@@ -0,0 +1,80 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Sequence, Tuple
+from fastapi import HTTPException
+from sqlmodel import and_, or_
+
+# A sort key is an orderable SQL expression plus its direction (True = descending)
+SortKey = Tuple[Any, bool]
+
+# Types a sort key value can have once decoded, anything else was not made by encode_cursor
+CURSOR_VALUE_TYPES = (str, int, float, Decimal, datetime)
+
+def _encode_value(value: Any) -> Any:
+    """Make a sort key value JSON safe without losing precision."""
+    if isinstance(value, Decimal):
+        return {"d": str(value)}
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    """Reverse of _encode_value."""
+    if isinstance(value, dict):
+        if "d" in value:
+            return Decimal(value["d"])
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+    return value
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key values of the last row of a page into an opaque cursor."""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, checking it has `size` values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        values = [_decode_value(value) for value in values]
+        if not all(isinstance(value, CURSOR_VALUE_TYPES) and not isinstance(value, bool) for value in values):
+            raise ValueError
+        return values
+    except (ValueError, TypeError, KeyError, binascii.Error, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def order_by_keys(keys: Sequence[SortKey]) -> List[Any]:
+    """Build ORDER BY clauses for the given sort keys."""
+    return [expression.desc() if descending else expression.asc() for expression, descending in keys]
+
+def _fits(expression: Any, value: Any) -> bool:
+    """Whether a decoded cursor value can be compared with a sort key expression."""
+    try:
+        expected = expression.type.python_type
+    except NotImplementedError:
+        return True
+    if issubclass(expected, (int, float, Decimal)):
+        return isinstance(value, (int, float, Decimal))
+    return isinstance(value, expected)
+
+def keyset_predicate(keys: Sequence[SortKey], values: Sequence[Any]):
+    """Build the WHERE clause selecting rows strictly after `values` in `keys` order.
+
+    Expands the row comparison into (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+    so it works with mixed sort directions on every backend.
+    """
+    if not all(_fits(expression, value) for (expression, _), value in zip(keys, values)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    clauses = []
+    for index, (expression, descending) in enumerate(keys):
+        value = values[index]
+        after = expression < value if descending else expression > value
+        equal_prefix = [keys[i][0] == values[i] for i in range(index)]
+        clauses.append(and_(*equal_prefix, after) if equal_prefix else after)
+    return or_(*clauses)
@@ -0,0 +1,57 @@
+import functools
+import json
+from typing import Any, List, Type, TypeVar
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used without it
+    orjson = None
+
+Model = TypeVar("Model", bound=BaseModel)
+
+def from_row(schema: Type[Model], row: Any, **values) -> Model:
+    """Build a response model from a database row without validating it again.
+
+    Only for rows whose column types already match the schema fields, pass
+    the values that need converting (or do not come from the row) as keywords.
+    """
+    fields = {name: getattr(row, name) for name in schema.model_fields if name not in values}
+    fields.update(values)
+    return schema.model_construct(**fields)
+
+@functools.lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def render_json(content: Any) -> bytes:
+    """Encode content the way FastJSONResponse sends it."""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if isinstance(content, (list, tuple)) and content and isinstance(content[0], BaseModel):
+        schema = type(content[0])
+        if all(type(item) is schema for item in content):
+            return _list_adapter(schema).dump_json(list(content))
+    if orjson is not None:
+        return orjson.dumps(content, default=_encode)
+    return json.dumps(
+        content, default=_encode, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for content the route already trusts.
+
+    Returned directly from a route it skips FastAPI's validation against the
+    response model and jsonable_encoder. Pydantic models are dumped the way a
+    response model would dump them, straight to JSON by pydantic-core. Other
+    content is encoded with orjson when it is installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
@@ -0,0 +1,21 @@
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+def seconds_until_midnight(now: datetime) -> float:
+    """Seconds left until the next local day boundary."""
+    next_midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return (next_midnight - now).total_seconds()
+
+async def run_daily(job: Callable[[], None]):
+    """Run a blocking job now and again right after every midnight, until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(job)
+        except Exception:
+            logger.exception("Scheduled job %s failed", getattr(job, "__name__", job))
+        # A second of slack so the job sees the new date
+        await asyncio.sleep(seconds_until_midnight(datetime.now()) + 1)
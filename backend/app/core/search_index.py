@@ -0,0 +1,91 @@
+import asyncio
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.freshness import Freshness
+from app.models.author import Author
+from app.models.book import Book
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Title matches count more than author matches, which count more than summary matches
+FIELD_WEIGHTS = {"book_title": 3.0, "author_name": 2.0, "book_summary": 1.0}
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+class BookSearchIndex:
+    """In-process inverted index over book titles, summaries and author names.
+
+    Used where the database has no full-text search (SQLite). Writers call
+    invalidate() and the next search rebuilds the index; it is also rebuilt
+    after CACHE_TTL_SECONDS so other workers pick up their writes. Request
+    handlers call refresh() before searching so only one rebuild runs at a time.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.freshness = Freshness(max_age_seconds)
+        # Postings and document count, replaced together once a build finished
+        self._index: Tuple[Dict[str, Dict[int, float]], int] = ({}, 0)
+        # Not a thread lock, a build awaits the async driver and must not block the event loop
+        self._refreshing = asyncio.Lock()
+
+    def invalidate(self):
+        """Force a rebuild on the next search."""
+        self.freshness.invalidate()
+
+    def _build(self, session: Session):
+        generation = self.freshness.generation
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        rows = session.exec(
+            select(Book.id, Book.book_title, Book.book_summary, Author.author_name)
+            .join(Author, Author.id == Book.author_id, isouter=True)
+        ).all()
+        for book_id, book_title, book_summary, author_name in rows:
+            weights: Counter = Counter()
+            for field, text in (("book_title", book_title), ("author_name", author_name), ("book_summary", book_summary)):
+                for token in tokenize(text):
+                    weights[token] += FIELD_WEIGHTS[field]
+            for token, weight in weights.items():
+                postings[token][book_id] = weight
+        self._index = (dict(postings), len(rows))
+        self.freshness.mark_built(generation)
+
+    async def refresh(self, session: AsyncSession):
+        """Rebuild the index through an async session when it is stale, one rebuild at a time."""
+        if not self.freshness.is_stale():
+            return
+        async with self._refreshing:
+            if self.freshness.is_stale():
+                await session.run_sync(self._build)
+
+    def search(self, session: Session, query: str, skip: int = 0, limit: int = 20) -> Tuple[List[int], int]:
+        """Return a page of book ids matching every query term, best first, and the match count."""
+        if self.freshness.is_stale():
+            self._build(session)
+        postings, document_count = self._index
+        document_count = document_count or 1
+
+        terms = set(tokenize(query))
+        if not terms:
+            return [], 0
+        matches = [postings.get(term, {}) for term in terms]
+        if not all(matches):
+            return [], 0
+
+        # Score by weighted term frequency times inverse document frequency
+        candidates = set.intersection(*(set(match) for match in sorted(matches, key=len)))
+        scores = {
+            book_id: sum(match[book_id] * math.log(1 + document_count / len(match)) for match in matches)
+            for book_id in candidates
+        }
+        ranked = sorted(scores, key=lambda book_id: (-scores[book_id], book_id))
+        return ranked[skip:skip + limit], len(ranked)
+
+book_search_index = BookSearchIndex(settings.CACHE_TTL_SECONDS)
@@ -1,5 +1,9 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
+from fastapi import HTTPException
 from jose import jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
@@ -7,12 +11,52 @@ from sqlmodel import Session, select
 from app.core.config import settings
 from app.models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with another cost are flagged for an update on the next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+class HashingPool:
+    """Runs bcrypt in worker threads so it never blocks the event loop.
+
+    bcrypt releases the GIL, so threads hash in parallel. At most
+    `max_pending` calls may wait or run at once, later ones are rejected
+    with a 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def run(self, function: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many logins in progress, try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+hashing_pool = HashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password off the event loop.
+
+    Returns whether it matches and, when the stored hash uses an outdated
+    cost, a new hash to store in its place.
+    """
+    return await hashing_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
     return pwd_context.hash(password)
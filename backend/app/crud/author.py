@@ -3,6 +3,15 @@ from sqlmodel import Session, select
 from app.models.user import User as UserModel
 from app.models.author import Author as AuthorModel
 from app.schemas.author import AuthorCreate, AuthorUpdate
+from app.core.cache import catalog_cache
+from app.core.search_index import book_search_index
+
+def invalidate_authors(author_id: int):
+    """Drop the cached author list, the cached author and search results matching author names."""
+    catalog_cache.invalidate("authors")
+    catalog_cache.invalidate("author", lambda params: params["author_id"] == author_id)
+    catalog_cache.invalidate("search")
+    book_search_index.invalidate()
 
 def create_author(session: Session, author_create: AuthorCreate, current_user: UserModel):
     """Create a new author."""
@@ -14,8 +23,10 @@ def create_author(session: Session, author_create: AuthorCreate, current_user: U
     session.add(db_author)
     session.commit()
     session.refresh(db_author)
+    invalidate_authors(db_author.id)
     return db_author
 
+@catalog_cache.cached("author")
 def get_author(session: Session, author_id: int):
     """Get a author."""
     db_author = session.get(AuthorModel, author_id)
@@ -23,6 +34,7 @@ def get_author(session: Session, author_id: int):
         raise HTTPException(status_code=404, detail="Author not found")
     return db_author
 
+@catalog_cache.cached("authors")
 def get_authors(session: Session):
     """Get orders."""
     statement = (
@@ -46,6 +58,7 @@ def update_author(session: Session, author_id: int, author_update: AuthorUpdate,
     session.add(db_author)
     session.commit()
     session.refresh(db_author)
+    invalidate_authors(author_id)
     return db_author
 
 def delete_author(session: Session, author_id: int, current_user: UserModel):
@@ -59,4 +72,5 @@ def delete_author(session: Session, author_id: int, current_user: UserModel):
         raise HTTPException(status_code=404, detail="Author not found")
     session.delete(db_author)
     session.commit()
+    invalidate_authors(author_id)
     return db_author
\ No newline at end of file
@@ -1,24 +1,60 @@
-from sqlmodel import Session, and_, case, or_, select, func, nullslast, SQLModel
-from typing import List, Optional
-from app.models.book import Book as BookModel
-from app.models.review import Review as ReviewModel
+import json
+from fastapi import HTTPException
+from sqlmodel import Session, delete, select, func, text, union, SQLModel
+from typing import Any, List, Optional, Tuple
+from app.models.book import Book as BookModel, SEARCH_CONFIG, book_search_vector
+from app.models.author import Author as AuthorModel, author_search_vector
+from app.models.category import Category as CategoryModel
+from app.models.user import User as UserModel
+from app.models.book_stats import BookStats as BookStatsModel
 from app.models.discount import Discount as DiscountModel
-from app.schemas.book import BookCreate, BookUpdate, Book, BookRead
-from datetime import date
+from app.models.effective_price import EffectivePrice as EffectivePriceModel
+from app.crud.effective_price import refresh_effective_prices
+from app.core.bulk import insert_and_update, write_in_chunks
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.home_shelves import home_shelves
+from app.core.responses import from_row
+from app.core.search_index import book_search_index
+from app.schemas.book import BookBulkRow, BookCreate, BookUpdate, Book, BookRead, HomeShelves
+from app.schemas.bulk import BulkResult, BulkRowError
+from app.core.pagination import decode_cursor, encode_cursor, keyset_predicate, order_by_keys
 
 # TODO: move this to response schema
 class BooksResponse(SQLModel):
     items: List[BookRead]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+def invalidate_book_listings(books: Optional[List[BookModel]] = None):
+    """Drop the cached listing pages that may contain any of the given books, all of them without books."""
+    def affected(params):
+        return any(
+            params["category_id"] in (None, book.category_id) and params["author_id"] in (None, book.author_id)
+            for book in books
+        )
+    catalog_cache.invalidate("books", None if books is None else affected)
+    home_shelves.invalidate()
+
+def invalidate_book(book_id: int):
+    """Drop the cached detail and search entries of a book."""
+    catalog_cache.invalidate("book", lambda params: params["book_id"] == book_id)
+    catalog_cache.invalidate("search")
+    book_search_index.invalidate()
 
 def create_book(session: Session, book_create: BookCreate) -> Book:
     """Create a new book."""
     db_book = BookModel(**book_create.model_dump())
     session.add(db_book)
+    session.flush()
+    refresh_effective_prices(session, [db_book.id])
     session.commit()
     session.refresh(db_book)
+    invalidate_book_listings([db_book])
+    invalidate_book(db_book.id)
     return db_book
 
+@catalog_cache.cached("book")
 def get_book(session: Session, book_id: int) -> Optional[Book]:
     """Get a book by ID."""
     book = session.get(BookModel, book_id)
@@ -26,6 +62,29 @@ def get_book(session: Session, book_id: int) -> Optional[Book]:
         return None
     return book
 
+def _select_with_keys(sort_keys):
+    """Select books with their review stats and the values of their sort keys."""
+    return (
+        select(
+            BookModel,
+            BookStatsModel.avg_rating.label("avg_rating"),
+            func.coalesce(BookStatsModel.review_count, 0).label("review_count"),
+            *[key.label(f"sort_key_{index}") for index, (key, _) in enumerate(sort_keys)]
+        )
+        .select_from(BookModel)
+        .outerjoin(BookStatsModel)
+    )
+
+def _estimate_rows(session: Session, statement) -> Optional[int]:
+    """Ask the Postgres planner how many rows a statement returns, without running it."""
+    # Inline the parameters, driver paramstyles differ between psycopg2 and asyncpg
+    compiled = statement.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+@catalog_cache.cached("books")
 def get_books(
     session: Session, 
     skip: int = 0, 
@@ -33,130 +92,158 @@ def get_books(
     sort_by: str = "onsale",
     category_id: Optional[int] = None,
     author_id: Optional[int] = None,
-    min_rating: Optional[int] = None
-) -> List[Book]:
-    """Get a list of books with optional filters and pagination."""
+    min_rating: Optional[int] = None,
+    cursor: Optional[str] = None,
+    total: str = "exact"
+) -> BooksResponse:
+    """Get a list of books with optional filters and pagination.
+
+    When `cursor` is given the page starts right after the row it was built
+    from (keyset pagination) and `skip` is ignored.
+    `total` is "exact" (window count in the page query), "estimate" (planner
+    estimate on Postgres, exact elsewhere) or "none" to skip counting. Cursor
+    pages leave an exact total out, it comes with the first page.
+    """
+    # Prices are materialized per book, see refresh_effective_prices
+    final_price = EffectivePriceModel.final_price
+    sub_price = EffectivePriceModel.sub_price
+
     # sorty by feature
-    statement = select(BookModel)
-    count_statement = select(func.count(BookModel.id).label("total"))
-
-    # Check discount expiration before applying it
-    # Create final price and sub price condition
-    final_price = case(
-            (
-                (DiscountModel.discount_price.is_not(None)) & 
-                (
-                    (DiscountModel.discount_end_date.is_(None)) | 
-                    ((DiscountModel.discount_start_date <= date.today()) & 
-                    (DiscountModel.discount_end_date >= date.today()))
-                ),
-                DiscountModel.discount_price
-            ),
-            # Otherwise use the book price
-            else_=BookModel.book_price
-        ).label("final_price")
-    
-    sub_price = case(
-            (
-                (DiscountModel.discount_price.is_not(None)) & 
-                (
-                    (DiscountModel.discount_end_date.is_(None)) | 
-                    ((DiscountModel.discount_start_date <= date.today()) & 
-                    (DiscountModel.discount_end_date >= date.today()))
-                ),
-                ( BookModel.book_price - DiscountModel.discount_price)
-            ),
-            # Otherwise use the book price
-            else_= None
-        ).label("sub_price")
+    # Sort keys must never be NULL so they can be compared against a cursor,
+    # the book id breaks ties so every row has a unique position
+    sort_keys = [(BookModel.id, False)]
+    statement = _select_with_keys(sort_keys)
+    if sort_by == "onsale":
+        sort_keys = [(sub_price, True), (final_price, False), (EffectivePriceModel.book_id, False)]
+        statement = _select_with_keys(sort_keys).join(EffectivePriceModel)
+
+    elif sort_by == "recommended":
+        sort_keys = [(func.coalesce(BookStatsModel.avg_rating, 0), True), (final_price, False), (BookModel.id, False)]
+        statement = _select_with_keys(sort_keys).join(EffectivePriceModel)
+
+    elif sort_by == "popular":
+        sort_keys = [(func.coalesce(BookStatsModel.review_count, 0), True), (final_price, False), (BookModel.id, False)]
+        statement = _select_with_keys(sort_keys).join(EffectivePriceModel)
+        
+    elif sort_by in ["price_asc", "price_desc"]:
+        sort_keys = [(final_price, sort_by == "price_desc"), (EffectivePriceModel.book_id, False)]
+        statement = _select_with_keys(sort_keys).join(EffectivePriceModel)
 
     # Apply all filters conditionally
     if category_id:
         statement = statement.where(BookModel.category_id == category_id)
-        count_statement = count_statement.where(BookModel.category_id == category_id)
     
     if author_id:
         statement = statement.where(BookModel.author_id == author_id)
-        count_statement = count_statement.where(BookModel.author_id == author_id)
 
-    rating_subquery = None
     if min_rating is not None:
-        rating_subquery = (
-            select(ReviewModel.book_id, func.avg(ReviewModel.rating_star).label("avg_rating"))
-            .group_by(ReviewModel.book_id)
-            .having(func.avg(ReviewModel.rating_star) >= min_rating)
-            .subquery()
+        rating_condition = BookModel.id.in_(
+            select(BookStatsModel.book_id).where(BookStatsModel.avg_rating >= min_rating)
         )
-        statement = statement.join(rating_subquery)
-        count_statement = count_statement.join(rating_subquery)
+        statement = statement.where(rating_condition)
     
-    if sort_by == "onsale":
-        statement = statement.outerjoin(DiscountModel).order_by(nullslast(sub_price.desc()), final_price.asc())
+    estimated_total = None
+    if total == "estimate" and session.get_bind().dialect.name == "postgresql":
+        estimated_total = _estimate_rows(session, statement)
 
-    elif sort_by == "recommended":
-        sub_query = (
-            select(ReviewModel.book_id, func.avg(ReviewModel.rating_star).label("avg_rating"))
-            .group_by(ReviewModel.book_id)
-            .subquery()
-        )
-        statement = statement.outerjoin(sub_query).outerjoin(DiscountModel).order_by(nullslast(sub_query.c.avg_rating.desc()), final_price.asc())
+    # Count the whole filtered listing in the same statement as the first page,
+    # cursor pages skip it so they only read the rows after the cursor
+    count_rows = not cursor and (total == "exact" or (total == "estimate" and estimated_total is None))
+    if count_rows:
+        statement = statement.add_columns(func.count().over().label("total"))
 
-    elif sort_by == "popular":
-        sub_query = (
-            select(ReviewModel.book_id, func.count(ReviewModel.id).label("total_reviews"))
-            .group_by(ReviewModel.book_id)
-            .subquery()
-        )
-
-        statement = statement.outerjoin(sub_query).outerjoin(DiscountModel).order_by(
-            nullslast(sub_query.c.total_reviews.desc()), 
-            final_price.asc())
-        
-    elif sort_by in ["price_asc", "price_desc"]:
-        # For price sorting, add discount condition to both main query and count
-        discount_condition = or_(
-            and_(
-                DiscountModel.discount_start_date <= date.today(),
-                DiscountModel.discount_end_date >= date.today()
-            ),
-            DiscountModel.discount_end_date == None
-        )
-        
-        # Apply join and condition to both statements
-        statement = statement.join(DiscountModel, 
-                                  and_(BookModel.id == DiscountModel.book_id, 
-                                       discount_condition), 
-                                  isouter=True)
-        
-        # Apply order direction based on sort_by value
-        if sort_by == "price_asc":
-            statement = statement.order_by(final_price.asc())
-        else:  # price_desc
-            statement = statement.order_by(final_price.desc())
+    if cursor:
+        statement = statement.where(keyset_predicate(sort_keys, decode_cursor(cursor, len(sort_keys))))
+    else:
+        statement = statement.offset(skip)
 
     # Apply pagination only to the main query after all joins and conditions
-    statement = statement.offset(skip).limit(limit)
+    statement = statement.order_by(*order_by_keys(sort_keys)).limit(limit)
+    rows = session.exec(statement).all()
 
-    books = session.exec(statement).all()
+    if not rows:
+        return BooksResponse(items=[], total=0 if count_rows else estimated_total)
 
-    total_result = session.exec(count_statement).first()
+    # A full page may have more rows behind it, so hand out a cursor to continue from
+    last_keys = rows[-1][3:len(sort_keys) + 3]
+    next_cursor = encode_cursor(last_keys) if len(rows) == limit else None
+    total_result = rows[0][-1] if count_rows else estimated_total
 
-    if not books:
+    items = [
+        from_row(BookRead, row[0], book_price=float(row[0].book_price), avg_rating=row[1], review_count=row[2])
+        for row in rows
+    ]
+    return BooksResponse(items=items, total=total_result, next_cursor=next_cursor)
+
+# Books per home page shelf, as many as the home page shows
+HOME_SHELF_SIZES = {"onsale": 10, "recommended": 8, "popular": 8}
+
+def build_home_shelves(session: Session) -> HomeShelves:
+    """Query every home page shelf, bypassing the listing cache."""
+    return HomeShelves(**{
+        sort_by: get_books.__wrapped__(session, 0, size, sort_by, total="none").items
+        for sort_by, size in HOME_SHELF_SIZES.items()
+    })
+
+def _search_item(row) -> BookRead:
+    """Build a search result from a book row with its review stats."""
+    return from_row(BookRead, row[0], book_price=float(row[0].book_price), avg_rating=row[1], review_count=row[2])
+
+def _search_books_fulltext(session: Session, q: str, skip: int, limit: int) -> BooksResponse:
+    """Rank books with Postgres full-text search, using the GIN indexes of book and author."""
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    matched = union(
+        select(BookModel.id).where(book_search_vector.bool_op("@@")(query)),
+        select(BookModel.id)
+        .join(AuthorModel, AuthorModel.id == BookModel.author_id)
+        .where(author_search_vector.bool_op("@@")(query)),
+    ).subquery()
+    document = (
+        func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(BookModel.book_title, "")), text("'A'"))
+        .op("||")(func.setweight(func.to_tsvector(SEARCH_CONFIG, AuthorModel.author_name), text("'B'")))
+        .op("||")(func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(BookModel.book_summary, "")), text("'C'")))
+    )
+    rank = func.ts_rank(document, query)
+    statement = (
+        _select_with_keys([])
+        .add_columns(func.count().over().label("total"))
+        .join(matched, matched.c.id == BookModel.id)
+        .join(AuthorModel, AuthorModel.id == BookModel.author_id)
+        .order_by(rank.desc(), BookModel.id.asc())
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = session.exec(statement).all()
+    if not rows:
         return BooksResponse(items=[], total=0)
-    
-    return BooksResponse(items=books, total=total_result)
+    return BooksResponse(items=[_search_item(row) for row in rows], total=rows[0][-1])
 
+@catalog_cache.cached("search")
+def search_books(session: Session, q: str, skip: int = 0, limit: int = 20) -> BooksResponse:
+    """Search books by title, summary and author name, best matches first."""
+    if session.get_bind().dialect.name == "postgresql":
+        return _search_books_fulltext(session, q, skip, limit)
+
+    book_ids, total = book_search_index.search(session, q, skip, limit)
+    rows = session.exec(_select_with_keys([]).where(BookModel.id.in_(book_ids))).all()
+    books = {row[0].id: _search_item(row) for row in rows}
+    return BooksResponse(items=[books[book_id] for book_id in book_ids if book_id in books], total=total)
 
 def update_book(session: Session, book_id: int, book_update: BookUpdate) -> Optional[Book]:
     """Update a book by ID."""
     db_book = session.get(BookModel, book_id)
     if not db_book:
         return None
+    old_book = BookModel.model_validate(db_book)
     for key, value in book_update.model_dump(exclude_unset=True).items():
         setattr(db_book, key, value)
     session.add(db_book)
+    session.flush()
+    refresh_effective_prices(session, [book_id])
     session.commit()
     session.refresh(db_book)
+    invalidate_book_listings([old_book, db_book])
+    invalidate_book(book_id)
     return db_book
 
 def delete_book(session: Session, book_id: int) -> Optional[Book]:
@@ -164,10 +251,54 @@ def delete_book(session: Session, book_id: int) -> Optional[Book]:
     db_book = session.get(BookModel, book_id)
     if not db_book:
         return None
+    old_book = BookModel.model_validate(db_book)
+    session.exec(delete(EffectivePriceModel).where(EffectivePriceModel.book_id == book_id))
+    session.exec(delete(BookStatsModel).where(BookStatsModel.book_id == book_id))
     session.delete(db_book)
     session.commit()
+    invalidate_book_listings([old_book])
+    invalidate_book(book_id)
     return db_book
 
+def _write_book_chunk(session: Session, rows: List[Tuple[int, BookBulkRow]]):
+    """Insert the new books and replace the existing ones of a bulk chunk, then commit."""
+    category_ids = {row.category_id for _, row in rows}
+    author_ids = {row.author_id for _, row in rows}
+    book_ids = {row.id for _, row in rows if row.id is not None}
+    known_categories = set(session.exec(select(CategoryModel.id).where(CategoryModel.id.in_(category_ids))).all())
+    known_authors = set(session.exec(select(AuthorModel.id).where(AuthorModel.id.in_(author_ids))).all())
+    known_books = set(session.exec(select(BookModel.id).where(BookModel.id.in_(book_ids))).all()) if book_ids else set()
+
+    def row_problems(row: BookBulkRow) -> List[str]:
+        problems = []
+        if row.category_id not in known_categories:
+            problems.append(f"category_id: Category {row.category_id} does not exist")
+        if row.author_id not in known_authors:
+            problems.append(f"author_id: Author {row.author_id} does not exist")
+        if row.id is not None and row.id not in known_books:
+            problems.append(f"id: Book {row.id} does not exist")
+        return problems
+
+    written, errors = insert_and_update(session, BookModel, rows, row_problems)
+    if not written:
+        return written, errors
+
+    refresh_effective_prices(session, [book_id for _, book_id, _ in written])
+    session.commit()
+    updated_ids = {book_id for _, book_id, created in written if not created}
+    invalidate_book_listings()
+    if updated_ids:
+        catalog_cache.invalidate("book", lambda params: params["book_id"] in updated_ids)
+    catalog_cache.invalidate("search")
+    book_search_index.invalidate()
+    return written, errors
+
+def bulk_write_books(session: Session, rows: List[Tuple[int, Any]], errors: List[BulkRowError], current_user: UserModel) -> BulkResult:
+    """Create or replace many books, one transaction and cache invalidation per chunk."""
+    if not current_user.admin:
+        raise HTTPException(status_code=400, detail="Need admin permission to create books")
+    return write_in_chunks(session, rows, errors, BookBulkRow, _write_book_chunk, settings.BULK_CHUNK_SIZE)
+
 def get_book_with_details(session: Session, book_id: int) -> Optional[Book]:
     statement = (
         select(BookModel)
@@ -0,0 +1,63 @@
+from sqlmodel import Session, case, cast, delete, func, insert, select, update, Float
+from app.models.book_stats import BookStats as BookStatsModel
+from app.models.review import Review as ReviewModel
+from app.db.upsert import upsert_insert
+
+STARS = range(1, 6)
+
+def _ensure_book_stats(session: Session, book_id: int):
+    """Make sure the stats row of a book exists."""
+    insert_statement = upsert_insert(session)
+    if insert_statement is not None:
+        session.exec(insert_statement(BookStatsModel).values(book_id=book_id).on_conflict_do_nothing())
+    elif not session.get(BookStatsModel, book_id):
+        session.add(BookStatsModel(book_id=book_id))
+        session.flush()
+
+def apply_rating(session: Session, book_id: int, rating_star: int, delta: int = 1):
+    """Add (delta=1) or remove (delta=-1) one rating from the stats of a book.
+
+    Runs as a single relative UPDATE inside the caller's transaction, the caller commits.
+    """
+    _ensure_book_stats(session, book_id)
+    star_column = getattr(BookStatsModel, f"star_{rating_star}")
+    review_count = BookStatsModel.review_count + delta
+    rating_sum = BookStatsModel.rating_sum + delta * rating_star
+    statement = (
+        update(BookStatsModel)
+        .where(BookStatsModel.book_id == book_id)
+        .values({
+            BookStatsModel.review_count: review_count,
+            BookStatsModel.rating_sum: rating_sum,
+            star_column: star_column + delta,
+            BookStatsModel.avg_rating: cast(rating_sum, Float) / func.nullif(review_count, 0),
+        })
+        .execution_options(synchronize_session=False)
+    )
+    session.exec(statement)
+    # The stats row may already be loaded in this session
+    stats = session.get(BookStatsModel, book_id)
+    if stats is not None:
+        session.expire(stats)
+
+def get_book_stats(session: Session, book_id: int):
+    """Get the review statistics of a book."""
+    return session.get(BookStatsModel, book_id)
+
+def rebuild_book_stats(session: Session) -> int:
+    """Recompute the stats of every book from the review table."""
+    columns = ["book_id", "review_count", "rating_sum", "avg_rating"] + [f"star_{star}" for star in STARS]
+    aggregate = (
+        select(
+            ReviewModel.book_id,
+            func.count(ReviewModel.id),
+            func.sum(ReviewModel.rating_star),
+            cast(func.avg(ReviewModel.rating_star), Float),
+            *[func.sum(case((ReviewModel.rating_star == star, 1), else_=0)) for star in STARS]
+        )
+        .group_by(ReviewModel.book_id)
+    )
+    session.exec(delete(BookStatsModel))
+    result = session.exec(insert(BookStatsModel).from_select(columns, aggregate))
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,54 @@
+from decimal import Decimal
+from typing import Dict
+from sqlmodel import Session, select
+from app.models.author import Author as AuthorModel
+from app.models.book import Book as BookModel
+from app.models.effective_price import EffectivePrice as EffectivePriceModel
+from app.crud.effective_price import charged_price
+from app.schemas.cart import CartQuote, CartQuoteLine
+
+def quote_cart(session: Session, cart: Dict[int, int]) -> CartQuote:
+    """Price every line of a cart with today's effective prices, in one query."""
+    rows = session.exec(
+        select(
+            BookModel.id,
+            BookModel.book_title,
+            BookModel.book_cover_photo,
+            AuthorModel.author_name,
+            BookModel.book_price,
+            charged_price
+        )
+        .outerjoin(AuthorModel, AuthorModel.id == BookModel.author_id)
+        .outerjoin(EffectivePriceModel, EffectivePriceModel.book_id == BookModel.id)
+        .where(BookModel.id.in_(cart))
+    ).all()
+    books = {row[0]: row for row in rows}
+
+    items = []
+    subtotal = total = Decimal(0)
+    for book_id, quantity in cart.items():
+        if book_id not in books:
+            continue
+        _, book_title, book_cover_photo, author_name, book_price, final_price = books[book_id]
+        line_total = quantity * final_price
+        items.append(CartQuoteLine(
+            book_id=book_id,
+            book_title=book_title,
+            book_cover_photo=book_cover_photo,
+            author_name=author_name,
+            quantity=quantity,
+            book_price=book_price,
+            final_price=final_price,
+            line_total=line_total,
+            line_savings=quantity * book_price - line_total
+        ))
+        subtotal += quantity * book_price
+        total += line_total
+
+    return CartQuote(
+        items=items,
+        subtotal=subtotal,
+        savings=subtotal - total,
+        total=total,
+        unavailable_book_ids=[book_id for book_id in cart if book_id not in books]
+    )
@@ -0,0 +1,12 @@
+from sqlmodel import Session, select
+from app.models.category import Category as CategoryModel
+from app.core.cache import catalog_cache
+
+@catalog_cache.cached("categories")
+def get_categories(session: Session):
+    """Get categories."""
+    statement = (
+        select(CategoryModel)
+        .order_by(CategoryModel.category_name.asc())
+    )
+    return session.exec(statement).all()
@@ -1,9 +1,25 @@
-from datetime import date
+from typing import Any, List, Tuple
 from fastapi import HTTPException
-from sqlmodel import Session, and_, or_, select
+from sqlmodel import Session, delete, select
 from app.models.user import User as UserModel
 from app.models.discount import Discount as DiscountModel
-from app.schemas.discount import DiscountCreate, DiscountUpdate
+from app.models.effective_price import EffectivePrice as EffectivePriceModel
+from app.models.book import Book as BookModel
+from app.crud.effective_price import refresh_effective_prices
+from app.crud.book import invalidate_book_listings
+from app.core.bulk import insert_and_update, write_in_chunks
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.schemas.bulk import BulkResult, BulkRowError
+from app.schemas.discount import DiscountBulkRow, DiscountCreate, DiscountUpdate
+
+def invalidate_discounted_books(session: Session, book_ids):
+    """Drop the cached discounts and listing pages affected by a price change of the given books."""
+    book_ids = set(book_ids)
+    catalog_cache.invalidate("discounts")
+    catalog_cache.invalidate("discount", lambda params: params["book_id"] in book_ids)
+    books = [session.get(BookModel, book_id) for book_id in book_ids if book_id is not None]
+    invalidate_book_listings([book for book in books if book])
 
 def create_discount(session: Session, discount_create: DiscountCreate, current_user: UserModel):
     """Create a new discount."""
@@ -13,38 +29,68 @@ def create_discount(session: Session, discount_create: DiscountCreate, current_u
     db_discount = DiscountModel(**discount_create.model_dump())
 
     session.add(db_discount)
+    session.flush()
+    refresh_effective_prices(session, [db_discount.book_id])
     session.commit()
     session.refresh(db_discount)
+    invalidate_discounted_books(session, [db_discount.book_id])
     return db_discount
 
+def _write_discount_chunk(session: Session, rows: List[Tuple[int, DiscountBulkRow]]):
+    """Insert the new discounts and replace the existing ones of a bulk chunk, then commit."""
+    book_ids = {row.book_id for _, row in rows}
+    discount_ids = {row.id for _, row in rows if row.id is not None}
+    known_books = set(session.exec(select(BookModel.id).where(BookModel.id.in_(book_ids))).all())
+    # Replacing a discount also changes the price of the book it was on
+    old_book_ids = dict(
+        session.exec(select(DiscountModel.id, DiscountModel.book_id).where(DiscountModel.id.in_(discount_ids))).all()
+    ) if discount_ids else {}
+
+    def row_problems(row: DiscountBulkRow) -> List[str]:
+        problems = []
+        if row.book_id not in known_books:
+            problems.append(f"book_id: Book {row.book_id} does not exist")
+        if row.id is not None and row.id not in old_book_ids:
+            problems.append(f"id: Discount {row.id} does not exist")
+        return problems
+
+    written, errors = insert_and_update(session, DiscountModel, rows, row_problems)
+    if not written:
+        return written, errors
+
+    rows_by_index = dict(rows)
+    affected = {rows_by_index[index].book_id for index, _, _ in written}
+    affected |= {old_book_ids[discount_id] for _, discount_id, created in written if not created}
+    affected.discard(None)
+    refresh_effective_prices(session, list(affected))
+    session.commit()
+    catalog_cache.invalidate("discounts")
+    catalog_cache.invalidate("discount")
+    invalidate_book_listings()
+    return written, errors
+
+def bulk_write_discounts(session: Session, rows: List[Tuple[int, Any]], errors: List[BulkRowError], current_user: UserModel) -> BulkResult:
+    """Create or replace many discounts, one transaction and cache invalidation per chunk."""
+    if not current_user.admin:
+        raise HTTPException(status_code=400, detail="Need admin permission to create discount")
+    return write_in_chunks(session, rows, errors, DiscountBulkRow, _write_discount_chunk, settings.BULK_CHUNK_SIZE)
+
+@catalog_cache.cached("discount")
 def get_discount(session: Session, book_id: int):
-    """Get a discount."""
+    """Get the discount applied to a book today."""
     statement = (
         select(DiscountModel)
-        .where(and_(
-            or_(
-                and_(
-                    DiscountModel.discount_start_date <= date.today(),
-                    DiscountModel.discount_end_date >= date.today()
-                ),
-                DiscountModel.discount_end_date == None
-            ),
-            DiscountModel.book_id == book_id
-        ))
+        .join(EffectivePriceModel, EffectivePriceModel.discount_id == DiscountModel.id)
+        .where(EffectivePriceModel.book_id == book_id)
     )
     return session.exec(statement).first()
 
+@catalog_cache.cached("discounts")
 def get_discounts(session: Session):
-    """Get discounts."""
+    """Get the discounts applied today."""
     statement = (
         select(DiscountModel)
-        .where(or_(
-            and_(
-                DiscountModel.discount_start_date <= date.today(),
-                DiscountModel.discount_end_date >= date.today()
-            ),
-            DiscountModel.discount_end_date == None
-        ))
+        .join(EffectivePriceModel, EffectivePriceModel.discount_id == DiscountModel.id)
     )
     return session.exec(statement).all()
 
@@ -57,12 +103,16 @@ def update_discount(session: Session, discount_id: int, discount_update: Discoun
     if not db_discount:
         raise HTTPException(status_code=404, detail="Discount not found")
     
+    old_book_id = db_discount.book_id
     for key, value in discount_update.model_dump(exclude_unset=True).items():
         setattr(db_discount, key, value)
     
     session.add(db_discount)
+    session.flush()
+    refresh_effective_prices(session, {old_book_id, db_discount.book_id})
     session.commit()
     session.refresh(db_discount)
+    invalidate_discounted_books(session, {old_book_id, db_discount.book_id})
     return db_discount
 
 def delete_discount(session: Session, discount_id: int, current_user: UserModel):
@@ -74,6 +124,12 @@ def delete_discount(session: Session, discount_id: int, current_user: UserModel)
 
     if not db_discount:
         raise HTTPException(status_code=404, detail="Discount not found")
+    # Release the effective price referencing this discount before deleting it
+    book_id = db_discount.book_id
+    session.exec(delete(EffectivePriceModel).where(EffectivePriceModel.book_id == book_id))
     session.delete(db_discount)
+    session.flush()
+    refresh_effective_prices(session, [book_id])
     session.commit()
+    invalidate_discounted_books(session, [book_id])
     return db_discount
\ No newline at end of file
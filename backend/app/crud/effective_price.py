@@ -0,0 +1,80 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from sqlmodel import Session, and_, delete, func, insert, or_, select, true
+from app.db.upsert import upsert_insert
+from app.models.book import Book as BookModel
+from app.models.discount import Discount as DiscountModel
+from app.models.effective_price import EffectivePrice as EffectivePriceModel
+
+# Price a book is charged at, its regular price when no effective price is stored
+charged_price = func.coalesce(EffectivePriceModel.final_price, BookModel.book_price)
+
+def active_discount_condition(day: date):
+    """Discounts that have started and not yet ended on `day`."""
+    return and_(
+        DiscountModel.discount_start_date <= day,
+        or_(DiscountModel.discount_end_date == None, DiscountModel.discount_end_date >= day)
+    )
+
+def refresh_effective_prices(session: Session, book_ids: Optional[Iterable[int]] = None, day: Optional[date] = None):
+    """Recompute the effective price of the given books (all books by default).
+
+    When several discounts are active the cheapest one wins. Runs inside the
+    caller's transaction, the caller commits. Where the database has an upsert
+    the rows are written in place, so workers refreshing at the same time
+    (at startup and at midnight) do not collide on book_id.
+    """
+    day = day or date.today()
+    best_discount = (
+        select(DiscountModel.id)
+        .where(DiscountModel.book_id == BookModel.id, active_discount_condition(day))
+        .order_by(DiscountModel.discount_price.asc(), DiscountModel.id.asc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    priced = select(BookModel.id, BookModel.book_price, best_discount.label("discount_id"))
+    if book_ids is not None:
+        book_ids = list(book_ids)
+        priced = priced.where(BookModel.id.in_(book_ids))
+    priced = priced.subquery()
+
+    final_price = func.coalesce(DiscountModel.discount_price, priced.c.book_price)
+    # Rounded to the cents of the column, SQLite keeps the difference as a float
+    # that would not compare equal to the sub_price of a listing cursor
+    rows = (
+        select(priced.c.id, priced.c.discount_id, final_price, func.round(priced.c.book_price - final_price, 2))
+        .select_from(priced)
+        .outerjoin(DiscountModel, DiscountModel.id == priced.c.discount_id)
+    )
+
+    columns = ["book_id", "discount_id", "final_price", "sub_price"]
+    insert_statement = upsert_insert(session)
+    if insert_statement is not None:
+        # In book order so concurrent refreshes lock the rows in the same order,
+        # the WHERE keeps SQLite from reading ON CONFLICT as part of the join
+        statement = insert_statement(EffectivePriceModel).from_select(columns, rows.where(true()).order_by(priced.c.id))
+        session.exec(statement.on_conflict_do_update(
+            index_elements=[EffectivePriceModel.book_id],
+            set_={column: statement.excluded[column] for column in columns[1:]}
+        ))
+        return
+
+    clear = delete(EffectivePriceModel)
+    if book_ids is not None:
+        clear = clear.where(EffectivePriceModel.book_id.in_(book_ids))
+    session.exec(clear)
+    session.exec(insert(EffectivePriceModel).from_select(columns, rows))
+
+def get_effective_price(session: Session, book_id: int):
+    """Get the effective price of a book."""
+    return session.get(EffectivePriceModel, book_id)
+
+def get_book_prices(session: Session, book_ids: Iterable[int]) -> Dict[int, Tuple[Decimal, Decimal]]:
+    """Regular and effective price of each existing book among `book_ids`, in one query."""
+    rows = session.exec(
+        select(BookModel.id, BookModel.book_price, charged_price)
+        .outerjoin(EffectivePriceModel, EffectivePriceModel.book_id == BookModel.id)
+        .where(BookModel.id.in_(set(book_ids)))
+    ).all()
+    return {book_id: (book_price, final_price) for book_id, book_price, final_price in rows}
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import Any, Tuple
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from sqlmodel import Session, and_, delete, or_, update
+from app.core.config import settings
+from app.db.upsert import upsert_insert
+from app.models.idempotency_key import IdempotencyKey as IdempotencyKeyModel
+
+def _expired_before() -> datetime:
+    return datetime.now(ZoneInfo("UTC")) - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+def _abandoned_before() -> datetime:
+    # Retries wait IDEMPOTENCY_WAIT_SECONDS for a running request, one still unfinished
+    # after twice that is taken over; safe because its response commits with its order
+    return datetime.now(ZoneInfo("UTC")) - timedelta(seconds=2 * settings.IDEMPOTENCY_WAIT_SECONDS)
+
+def _insert_if_absent(session: Session, record: IdempotencyKeyModel) -> bool:
+    """Insert a key record unless the key exists, return whether it was inserted."""
+    insert_statement = upsert_insert(session)
+    if insert_statement is not None:
+        result = session.exec(insert_statement(IdempotencyKeyModel).values(**record.model_dump(exclude_none=True)).on_conflict_do_nothing())
+        return result.rowcount == 1
+    if session.get(IdempotencyKeyModel, (record.user_id, record.key)):
+        return False
+    session.add(record)
+    session.flush()
+    return True
+
+def _owned_by(claim: IdempotencyKeyModel):
+    """Match the row of a claim only while no retry has taken the key over and it is unfinished."""
+    return and_(
+        IdempotencyKeyModel.user_id == claim.user_id,
+        IdempotencyKeyModel.key == claim.key,
+        IdempotencyKeyModel.created_at == claim.created_at,
+        IdempotencyKeyModel.status_code == None
+    )
+
+def claim_idempotency_key(session: Session, user_id: int, key: str, request_hash: str) -> Tuple[IdempotencyKeyModel, bool]:
+    """Claim an idempotency key for a new request.
+
+    Returns the caller's claim and True when it now owns the key and should
+    run the request, otherwise the record of the earlier request sent with
+    the same key and False.
+    """
+    # An expired record no longer protects its key, nor does an abandoned claim
+    session.exec(
+        delete(IdempotencyKeyModel)
+        .where(
+            IdempotencyKeyModel.user_id == user_id,
+            IdempotencyKeyModel.key == key,
+            or_(
+                IdempotencyKeyModel.created_at < _expired_before(),
+                and_(IdempotencyKeyModel.status_code == None, IdempotencyKeyModel.created_at < _abandoned_before())
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claim = IdempotencyKeyModel(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        created_at=datetime.now(ZoneInfo("UTC"))
+    )
+    claimed = _insert_if_absent(session, claim)
+    session.commit()
+    if claimed:
+        return claim, True
+
+    record = session.get(IdempotencyKeyModel, (user_id, key), populate_existing=True)
+    if record is None:
+        # The earlier request failed and released the key in the meantime
+        return claim_idempotency_key(session, user_id, key, request_hash)
+    if record.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    return record, False
+
+def complete_idempotency_key(session: Session, claim: IdempotencyKeyModel, status_code: int, response: Any):
+    """Store the response of a claim in the caller's transaction, the caller commits.
+
+    Run it in the transaction that does the request's writes, so a claim
+    without a stored response never has committed writes behind it. Raises 409
+    when a retry took the key over, the caller must then roll back.
+    """
+    result = session.exec(
+        update(IdempotencyKeyModel)
+        .where(_owned_by(claim))
+        .values(status_code=status_code, response=response)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise HTTPException(status_code=409, detail="A retry with this Idempotency-Key took over the request")
+
+def release_idempotency_key(session: Session, claim: IdempotencyKeyModel):
+    """Forget a claim whose request failed, so the client can retry it."""
+    session.rollback()
+    session.exec(delete(IdempotencyKeyModel).where(_owned_by(claim)).execution_options(synchronize_session=False))
+    session.commit()
+
+def purge_idempotency_keys(session: Session) -> int:
+    """Delete the records older than IDEMPOTENCY_KEY_TTL_HOURS."""
+    result = session.exec(
+        delete(IdempotencyKeyModel)
+        .where(IdempotencyKeyModel.created_at < _expired_before())
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return result.rowcount
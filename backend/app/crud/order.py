@@ -1,12 +1,17 @@
+from collections import defaultdict
 from datetime import datetime
-from fastapi import HTTPException
-from sqlmodel import Session, select
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlmodel import Session, insert, select
 from app.models.user import User as UserModel
 from app.models.order import Order as OrderModel
-from app.models.book import Book as BookModel
-from app.models.discount import Discount as DiscountModel
-from app.schemas.order import OrderCreate, OrderUpdate
+from app.crud.effective_price import get_book_prices
+from app.crud.idempotency_key import complete_idempotency_key
+from app.models.idempotency_key import IdempotencyKey as IdempotencyKeyModel
+from app.schemas.order import OrderCreate, OrderItemRead, OrderRead, OrderUpdate, OrderWithItems
+from app.schemas.response import OrdersResponse
 from app.models.order import OrderItem
+from app.core.pagination import decode_cursor, encode_cursor, keyset_predicate, order_by_keys
 
 def get_order(session: Session, order_id: int):
     """Get a order."""
@@ -24,6 +29,37 @@ def get_orders(session: Session, skip: int = 0, limit: int = 10):
     )
     return session.exec(statement).all()
 
+def get_user_orders(session: Session, user_id: int, limit: int = 10, cursor: Optional[str] = None) -> OrdersResponse:
+    """Get a page of a user's orders with their items, newest first.
+
+    Pages by keyset on (order_date, id), pass the `next_cursor` of a page to
+    get the next one. The items of the whole page are loaded in one query.
+    """
+    sort_keys = [(OrderModel.order_date, True), (OrderModel.id, True)]
+    statement = select(OrderModel).where(OrderModel.user_id == user_id)
+    if cursor:
+        statement = statement.where(keyset_predicate(sort_keys, decode_cursor(cursor, len(sort_keys))))
+    orders = session.exec(statement.order_by(*order_by_keys(sort_keys)).limit(limit)).all()
+
+    items = defaultdict(list)
+    if orders:
+        statement = (
+            select(OrderItem)
+            .where(OrderItem.order_id.in_([order.id for order in orders]))
+            .order_by(OrderItem.order_id, OrderItem.id)
+        )
+        for item in session.exec(statement).all():
+            items[item.order_id].append(OrderItemRead.model_validate(item))
+
+    # A full page may have more orders behind it, so hand out a cursor to continue from
+    next_cursor = None
+    if len(orders) == limit:
+        next_cursor = encode_cursor([orders[-1].order_date, orders[-1].id])
+    return OrdersResponse(
+        items=[OrderWithItems.model_validate(order, update={"order_items": items[order.id]}) for order in orders],
+        next_cursor=next_cursor
+    )
+
 def update_order(session: Session, order_id: int, order_update: OrderUpdate):
     """Update a order."""
     db_order = session.get(OrderModel, order_id)
@@ -48,39 +84,31 @@ def delete_order(session: Session, order_id: int):
     session.commit()
     return db_order
 
-def place_order(session: Session, order_create: OrderCreate, current_user: UserModel):
-    """Place an order."""
-    invalid_items = []
+def place_order(
+    session: Session,
+    order_create: OrderCreate,
+    current_user: UserModel,
+    idempotency_claim: Optional[IdempotencyKeyModel] = None
+):
+    """Place an order.
+
+    With an idempotency claim the response is stored on it in the same
+    transaction as the order, so a retry either replays it or finds no order.
+    """
     # Validate user
     if not current_user.id:
         raise HTTPException(status_code=400, detail="Stay logged in to place an order")
-    
-    # Calculate total amount and prepare order items
-    total_amount = 0.0
-    order_create.order_date = datetime.now()
 
-    for item in order_create.items:
-        book = session.get(BookModel, item.book_id)
-        if not book:
-            invalid_items.append({
-                "book_id": item.book_id,
-                "error": f"Book with id {item.book_id} not found"
-            })
-            continue  # Skip this item but continue checking others
-        
-        discount = session.exec(
-            select(DiscountModel)
-            .where(DiscountModel.book_id == item.book_id, 
-                   DiscountModel.discount_start_date <= datetime.now(),
-                   (DiscountModel.discount_end_date == None) | 
-                   (DiscountModel.discount_end_date >= datetime.now())
-            )
-        ).first()
-
-        # Use discounted price if available, otherwise use regular price
-        price = float(discount.discount_price) if discount else float(book.book_price)
-        item_total = item.quantity * price
-        total_amount += item_total
+    # Resolve every line's price in one query, the total and the items share it
+    prices = get_book_prices(session, [item.book_id for item in order_create.items])
+    invalid_items = [
+        {
+            "book_id": item.book_id,
+            "error": f"Book with id {item.book_id} not found"
+        }
+        for item in order_create.items
+        if item.book_id not in prices
+    ]
 
     # If any items are invalid, raise exception with all errors
     if invalid_items:
@@ -92,6 +120,9 @@ def place_order(session: Session, order_create: OrderCreate, current_user: UserM
             }
         )
 
+    order_create.order_date = datetime.now()
+    total_amount = sum(item.quantity * prices[item.book_id][1] for item in order_create.items)
+
     # Create new order
     new_order = OrderModel(
         user_id=current_user.id,
@@ -101,30 +132,22 @@ def place_order(session: Session, order_create: OrderCreate, current_user: UserM
     session.add(new_order)
     session.flush()
 
-    for item in order_create.items:
-        book = session.get(BookModel, item.book_id)
-        if not book:
-            raise HTTPException(status_code=404, detail=f"Book with id {item.book_id} not found")
-        
-        discount = session.exec(
-            select(DiscountModel)
-            .where(DiscountModel.book_id == item.book_id, 
-                   DiscountModel.discount_start_date <= datetime.now(),
-                   (DiscountModel.discount_end_date == None) | 
-                   (DiscountModel.discount_end_date >= datetime.now())
-            )
-        ).first()
-
-        # Use discounted price if available, otherwise use regular price
-        price = float(discount.discount_price) if discount else float(book.book_price)
-        order_item = OrderItem(
-            order_id=new_order.id,
-            book_id=item.book_id,
-            quantity=item.quantity,
-            price=price
+    if order_create.items:
+        session.exec(
+            insert(OrderItem),
+            params=[
+                {
+                    "order_id": new_order.id,
+                    "book_id": item.book_id,
+                    "quantity": item.quantity,
+                    "price": prices[item.book_id][1],
+                }
+                for item in order_create.items
+            ]
         )
-        session.add(order_item)
-    
+    if idempotency_claim is not None:
+        response = OrderRead.model_validate(new_order).model_dump(mode="json")
+        complete_idempotency_key(session, idempotency_claim, status.HTTP_201_CREATED, response)
     session.commit()
     
-    return new_order
\ No newline at end of file
+    return new_order
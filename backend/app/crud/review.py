@@ -1,10 +1,16 @@
+from typing import Iterable, List, Optional
 from fastapi import HTTPException
-from sqlmodel import Session, func, select
+from sqlmodel import Session, select
 from app.models.user import User as UserModel
 from app.models.review import Review as ReviewModel
 from app.models.book import Book as BookModel
-from app.schemas.review import ReviewCreate, ReviewUpdate
+from app.schemas.review import BookRatingSummary, ReviewCreate, ReviewRead, ReviewUpdate, RatingRead
+from app.models.book_stats import BookStats as BookStatsModel
+from app.crud.book_stats import STARS, apply_rating, get_book_stats
+from app.crud.book import invalidate_book_listings
 from app.schemas.response import ReviewsResponse
+from app.core.pagination import decode_cursor, encode_cursor, keyset_predicate, order_by_keys
+from app.core.responses import from_row
 
 def create_review(session: Session, review_create: ReviewCreate, book_id: int):
     """Create a new review."""
@@ -29,8 +35,10 @@ def create_review(session: Session, review_create: ReviewCreate, book_id: int):
     db_review.book_id = book_id
 
     session.add(db_review)
+    apply_rating(session, book_id, rating)
     session.commit()
     session.refresh(db_review)
+    invalidate_book_listings([book])
     return db_review
 
 def get_review(session: Session, review_id: int):
@@ -40,35 +48,85 @@ def get_review(session: Session, review_id: int):
         raise HTTPException(status_code=404, detail="Review not found")
     return review
 
-def get_reviews(session: Session, book_id: int, rating: int, sort_by: str, skip: int = 0, limit: int = 10):
-    """Get reviews by book_id."""
-    statement = (
-        select(ReviewModel)
-        .where(ReviewModel.book_id == book_id)
-        .offset(skip)
-        .limit(limit)
-    )
-    count_statement = select(func.count(ReviewModel.id).label("total")).where(ReviewModel.book_id == book_id)
+def get_reviews(
+    session: Session,
+    book_id: int,
+    rating: int,
+    sort_by: str,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+):
+    """Get reviews by book_id.
+
+    When `cursor` is given the page starts right after the review it was
+    built from (keyset pagination) and `skip` is ignored. The total comes
+    from the book's review stats instead of a COUNT per page.
+    """
+    if rating and rating not in STARS:
+        raise HTTPException(status_code=400, detail="Rating must be a number between 1 and 5")
+
+    # The review id breaks ties between reviews posted at the same time
+    descending = sort_by != "oldest to newest"
+    sort_keys = [(ReviewModel.review_date, descending), (ReviewModel.id, descending)]
+    statement = select(ReviewModel).where(ReviewModel.book_id == book_id)
     if rating:
         statement = statement.where(ReviewModel.rating_star == rating)
-    if sort_by == "newest to oldest":
-        statement = statement.order_by(ReviewModel.review_date.desc())
-    elif sort_by == "oldest to newest":
-        statement = statement.order_by(ReviewModel.review_date.asc())
-    reviews = session.exec(statement).all()
-    total_reviews = session.exec(count_statement).one()
-    if not reviews:
-        return ReviewsResponse(items=[], total=0)
-    return ReviewsResponse(items=reviews, total=total_reviews)
+    if cursor:
+        statement = statement.where(keyset_predicate(sort_keys, decode_cursor(cursor, len(sort_keys))))
+    else:
+        statement = statement.offset(skip)
+    reviews = session.exec(statement.order_by(*order_by_keys(sort_keys)).limit(limit)).all()
+
+    stats = get_book_stats(session, book_id)
+    if not stats:
+        total_reviews = 0
+    elif rating:
+        total_reviews = getattr(stats, f"star_{rating}")
+    else:
+        total_reviews = stats.review_count
+
+    # A full page may have more reviews behind it, so hand out a cursor to continue from
+    next_cursor = None
+    if reviews and len(reviews) == limit:
+        next_cursor = encode_cursor([reviews[-1].review_date, reviews[-1].id])
+    items = [from_row(ReviewRead, review) for review in reviews]
+    return ReviewsResponse(items=items, total=total_reviews, next_cursor=next_cursor)
+
+def _rating_histogram(stats: BookStatsModel) -> List[RatingRead]:
+    """Review count per star of a book, leaving out stars nobody gave."""
+    return [
+        RatingRead(rating_star=star, review_count=getattr(stats, f"star_{star}"))
+        for star in STARS
+        if getattr(stats, f"star_{star}")
+    ]
 
 def get_reviews_ratings(session: Session, book_id: int):
     """Get ratings by book_id."""
-    statement = (
-        select(ReviewModel.rating_star, func.count(ReviewModel.book_id).label("review_count"))
-        .where(ReviewModel.book_id == book_id)
-        .group_by(ReviewModel.rating_star)
-    )
-    return session.exec(statement).all()
+    stats = get_book_stats(session, book_id)
+    if not stats:
+        return []
+    return _rating_histogram(stats)
+
+def get_ratings_summaries(session: Session, book_ids: Iterable[int]) -> List[BookRatingSummary]:
+    """Get the rating summary of many books in one query, books without reviews get an empty one."""
+    book_ids = list(dict.fromkeys(book_ids))
+    stats = {
+        row.book_id: row
+        for row in session.exec(select(BookStatsModel).where(BookStatsModel.book_id.in_(book_ids))).all()
+    }
+    summaries = []
+    for book_id in book_ids:
+        if book_id not in stats:
+            summaries.append(BookRatingSummary(book_id=book_id))
+            continue
+        summaries.append(BookRatingSummary(
+            book_id=book_id,
+            avg_rating=stats[book_id].avg_rating,
+            review_count=stats[book_id].review_count,
+            ratings=_rating_histogram(stats[book_id])
+        ))
+    return summaries
 
 def update_review(session: Session, review_id: int, review_update: ReviewUpdate):
     """Update a review."""
@@ -76,12 +134,21 @@ def update_review(session: Session, review_id: int, review_update: ReviewUpdate)
     if not db_review:
         raise HTTPException(status_code=404, detail="Review not found")
     
+    old_rating = db_review.rating_star
     for key, value in review_update.model_dump(exclude_unset=True).items():
         setattr(db_review, key, value)
+
+    if db_review.rating_star != old_rating:
+        if db_review.rating_star not in STARS:
+            raise HTTPException(status_code=400, detail="Rating must be a number between 1 and 5")
+        apply_rating(session, db_review.book_id, old_rating, -1)
+        apply_rating(session, db_review.book_id, db_review.rating_star)
     
     session.add(db_review)
     session.commit()
     session.refresh(db_review)
+    if db_review.rating_star != old_rating:
+        invalidate_book_listings([session.get(BookModel, db_review.book_id)])
     return db_review
 
 def delete_review(session: Session, review_id: int):
@@ -90,6 +157,9 @@ def delete_review(session: Session, review_id: int):
 
     if not db_review:
         raise HTTPException(status_code=404, detail="Review not found")
+    book_id = db_review.book_id
     session.delete(db_review)
+    apply_rating(session, book_id, db_review.rating_star, -1)
     session.commit()
+    invalidate_book_listings([session.get(BookModel, book_id)])
     return db_review
\ No newline at end of file
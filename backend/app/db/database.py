@@ -1,12 +1,47 @@
+import time
+from fastapi import Request, Response
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.cache import SKIP_CACHE
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.replicas import ReplicaSet
 
 # I don't know why if I not import those models it will not generate the tables
 from app.models.order import Order, OrderItem
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Async drivers used by the request handlers for each sync driver
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def get_async_database_url(database_url: str) -> str:
+    """Swap the driver of a database URL for its async counterpart."""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+# Sync engine for startup, scheduled jobs and scripts
+engine = create_engine(DATABASE_URL, echo=settings.SQL_ECHO)
+
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL or get_async_database_url(DATABASE_URL), echo=settings.SQL_ECHO)
+
+replicas = ReplicaSet([
+    create_async_engine(get_async_database_url(url), echo=settings.SQL_ECHO)
+    for url in settings.DATABASE_REPLICA_URLS
+])
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+for replica_engine in replicas.engines:
+    instrument_engine(replica_engine.sync_engine)
+
+# Set on writes, holds the time until which the client reads from the primary
+PRIMARY_COOKIE = "read_primary_until"
 
 def create_db_and_tables():
     """Create the database and tables on startup."""
@@ -16,4 +51,42 @@ def create_db_and_tables():
 def get_session():
     """Get a database session."""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session():
+    """Get an async database session.
+
+    CRUD functions are written against the sync Session API, run them with
+    `await session.run_sync(crud_function, ...)` so their queries go through
+    the async driver without blocking the event loop.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def get_write_session(response: Response):
+    """Get an async session on the primary for a request that writes.
+
+    With replicas configured, the client's reads stay on the primary for
+    READ_YOUR_WRITES_SECONDS so it sees its own order or review.
+    """
+    if replicas.engines:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            str(int(time.time()) + settings.READ_YOUR_WRITES_SECONDS),
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def get_read_session(request: Request):
+    """Get an async session for a read-only request, on a healthy replica when there is one."""
+    primary_until = request.cookies.get(PRIMARY_COOKIE, "")
+    read_your_writes = primary_until.isdigit() and int(primary_until) > time.time()
+    read_engine = None if read_your_writes else replicas.pick()
+    async with AsyncSession(read_engine or async_engine, expire_on_commit=False) as session:
+        if read_your_writes:
+            # The catalog cache may hold pages filled from a lagging replica since the write
+            session.info[SKIP_CACHE] = True
+        yield session
@@ -0,0 +1,76 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+class QueryStats:
+    """Statements run while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+        # Warn once per statement, when it reaches the threshold
+        if self.statements[statement] == settings.SQL_REPEATED_QUERY_THRESHOLD:
+            logger.warning(
+                "Statement ran %d times in one request, possible N+1: %s",
+                settings.SQL_REPEATED_QUERY_THRESHOLD, statement,
+            )
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s parameters=%.500r", duration * 1000, statement, parameters)
+
+def instrument_engine(engine: Engine):
+    """Time every statement an engine runs, for the request stats and the slow query log."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryTimingMiddleware:
+    """Report each request's query count and database time in a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
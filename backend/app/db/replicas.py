@@ -0,0 +1,49 @@
+import asyncio
+import itertools
+import logging
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+class ReplicaSet:
+    """Read replicas handed out round-robin, skipping the ones failing health checks."""
+
+    def __init__(self, engines: List[AsyncEngine], check_timeout_seconds: float = 2.0):
+        self.engines = engines
+        self.check_timeout_seconds = check_timeout_seconds
+        # Assume healthy until the first check says otherwise
+        self._healthy = list(engines)
+        self._counter = itertools.count()
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """Next healthy replica, None when there is none to read from."""
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def _is_healthy(self, engine: AsyncEngine) -> bool:
+        try:
+            async with engine.connect() as connection:
+                await asyncio.wait_for(connection.execute(text("SELECT 1")), self.check_timeout_seconds)
+            return True
+        except Exception as exc:
+            logger.warning("Replica %s failed its health check: %s", engine.url.render_as_string(), exc)
+            return False
+
+    async def check(self):
+        """Probe every replica and keep the ones that answered."""
+        results = await asyncio.gather(*(self._is_healthy(engine) for engine in self.engines))
+        self._healthy = [engine for engine, healthy in zip(self.engines, results) if healthy]
+
+    async def run_health_checks(self, interval_seconds: float):
+        """Check the replicas every interval, until cancelled."""
+        while True:
+            await self.check()
+            await asyncio.sleep(interval_seconds)
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
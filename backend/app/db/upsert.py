@@ -0,0 +1,11 @@
+from typing import Callable, Optional
+from sqlmodel import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# Dialects whose INSERT ... ON CONFLICT can add a row without racing a concurrent insert
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+def upsert_insert(session: Session) -> Optional[Callable]:
+    """The insert() construct with on_conflict_* of the session's dialect, None when it has none."""
+    return _UPSERT_INSERTS.get(session.get_bind().dialect.name)
@@ -3,18 +3,30 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 import jwt
-from sqlmodel import Session, select
-from app.core.security import verify_password
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.cache import CacheKey, ResponseCache
+from app.core.security import verify_and_update_password
 from app.models.user import User
-from app.db.database import get_session
+from app.db.database import get_async_session
 from app.core.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-async def get_user(email: str, session: Session) -> Optional[User]:
+# Users by token subject, so authenticated requests skip the user lookup
+principal_cache = ResponseCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def _principal_key(email: str) -> CacheKey:
+    return ("principal", (("email", email),))
+
+def invalidate_principal(email: Optional[str] = None):
+    """Drop the cached user of an email, or every cached user. Call after changing or deleting a user."""
+    principal_cache.invalidate("principal", None if email is None else lambda params: params["email"] == email)
+
+async def get_user(email: str, session: AsyncSession) -> Optional[User]:
     """Retrieve a user from the database by username."""
     statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -23,19 +35,26 @@ async def get_user(email: str, session: Session) -> Optional[User]:
         )
     return user
         
-async def authenticate_user(email: str, password: str, session: Session = Depends(get_session)) -> Optional[User]:
+async def authenticate_user(email: str, password: str, session: AsyncSession = Depends(get_async_session)) -> Optional[User]:
     """Authenticate a user by username and password."""
     user = await get_user(email, session)
     
-    if not verify_password(password, user.password):
+    verified, new_hash = await verify_and_update_password(password, user.password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # The hash was made with an older cost, replace it while we have the password
+    if new_hash is not None:
+        user.password = new_hash
+        session.add(user)
+        await session.commit()
+        invalidate_principal(user.email)
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)) -> User:
     """Get the current user from the token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,9 +66,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user = await get_user(email=email, session=session)
-    if user is None:
+    except (JWTError, jwt.PyJWTError):
         raise credentials_exception
-    return user
\ No newline at end of file
+
+    found, user = principal_cache.get(_principal_key(email))
+    # Tokens carry the user id and admin flag, a cached user that disagrees is stale
+    if not found or payload.get("uid", user.id) != user.id or payload.get("admin", user.admin) != user.admin:
+        user = await get_user(email=email, session=session)
+        if user is None:
+            raise credentials_exception
+        user = User.model_validate(user)
+        principal_cache.set(_principal_key(email), user)
+    return user
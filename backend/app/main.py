@@ -9,11 +9,40 @@ from app.api.routers.auth import router as auth_router
 from app.api.routers.discounts import router as discounts_router
 from app.api.routers.reviews import router as reviews_router
 from app.api.routers.orders import router as orders_router
+from app.api.routers.cache import router as cache_router
 from app.core.security import get_password_hash
-from app.db.database import create_db_and_tables, engine
+from app.core.scheduler import run_daily
+from app.crud.effective_price import refresh_effective_prices
+from app.crud.idempotency_key import purge_idempotency_keys
+from app.core.cache import catalog_cache
+from app.core.home_shelves import home_shelves
+from app.crud.book import build_home_shelves
+from app.db.database import async_engine, create_db_and_tables, engine, replicas
+from app.db.instrumentation import QueryTimingMiddleware
 from app.models.user import User
 from app.core.config import settings
 from contextlib import asynccontextmanager
+import asyncio
+
+
+def refresh_prices():
+    """Recompute the effective price of every book for today."""
+    with Session(engine) as session:
+        refresh_effective_prices(session)
+        session.commit()
+    for namespace in ("books", "discounts", "discount"):
+        catalog_cache.invalidate(namespace)
+    home_shelves.invalidate()
+
+def rebuild_home_shelves():
+    """Query the home page shelves for the in-memory copy."""
+    with Session(engine) as session:
+        return build_home_shelves(session)
+
+def purge_expired_idempotency_keys():
+    """Delete the stored responses of expired idempotency keys."""
+    with Session(engine) as session:
+        purge_idempotency_keys(session)
 
 
 # On startup event
@@ -36,7 +65,21 @@ async def lifespan(app: FastAPI):
         session.add(existing_admin_user)
         session.commit()
         session.refresh(existing_admin_user)
+
+    # Activate and expire discounts at every day boundary
+    price_refresher = asyncio.create_task(run_daily(refresh_prices))
+    key_purger = asyncio.create_task(run_daily(purge_expired_idempotency_keys))
+    # Serve the home page from memory, rebuilt after catalog writes
+    shelf_refresher = asyncio.create_task(home_shelves.run(rebuild_home_shelves))
+    # Stop reading from replicas that are down
+    replica_checker = asyncio.create_task(replicas.run_health_checks(settings.REPLICA_HEALTH_CHECK_SECONDS))
     yield
+    price_refresher.cancel()
+    key_purger.cancel()
+    shelf_refresher.cancel()
+    replica_checker.cancel()
+    await replicas.dispose()
+    await async_engine.dispose()
     
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION, lifespan=lifespan)
 
@@ -46,7 +89,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Server-Timing"],
 )  
+app.add_middleware(QueryTimingMiddleware)
 
 app.include_router(auth_router, prefix="/api/routers/auth", tags=["auth"])
 app.include_router(books_router, prefix="/api/routers/books", tags=["books"])
@@ -55,4 +100,5 @@ app.include_router(categories_router, prefix="/api/routers/categories", tags=["c
 app.include_router(cart_router, prefix="/api/routers/cart", tags=["cart"])
 app.include_router(discounts_router, prefix="/api/routers/discounts", tags=["discounts"])
 app.include_router(reviews_router, prefix="/api/routers/reviews", tags=["reviews"])
-app.include_router(orders_router, prefix="/api/routers/orders", tags=["orders"])
\ No newline at end of file
+app.include_router(orders_router, prefix="/api/routers/orders", tags=["orders"])
+app.include_router(cache_router, prefix="/api/routers/cache", tags=["cache"])
\ No newline at end of file
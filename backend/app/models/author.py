@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, func, text
 from typing import Optional
 
 class Author(SQLModel, table=True):
@@ -6,4 +7,7 @@ class Author(SQLModel, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     author_name: str = Field(max_length=255)
-    author_bio: Optional[str]
\ No newline at end of file
+    author_bio: Optional[str]
+
+author_search_vector = func.to_tsvector(text("'english'"), Author.__table__.c.author_name)
+Index("ix_author_search", author_search_vector, postgresql_using="gin").ddl_if(dialect="postgresql")
@@ -1,6 +1,6 @@
 from decimal import Decimal
 from sqlmodel import Numeric, SQLModel, Field
-from sqlalchemy import BigInteger, Text
+from sqlalchemy import BigInteger, Index, Text, func, text
 from typing import Optional
 
 from app.models.discount import Discount
@@ -9,11 +9,19 @@ class Book(SQLModel, table=True):
     """Book model for the application."""
     
     id: Optional[int] = Field(sa_type=BigInteger, primary_key=True, default=None)
-    category_id: Optional[int] = Field(sa_type=BigInteger, default=None, foreign_key="category.id")
-    author_id: int = Field(sa_type=BigInteger, foreign_key="author.id")
+    category_id: Optional[int] = Field(sa_type=BigInteger, default=None, foreign_key="category.id", index=True)
+    author_id: int = Field(sa_type=BigInteger, foreign_key="author.id", index=True)
     book_title: str = Field(max_length=255)
     book_summary: Optional[str] = Field(sa_type=Text, default=None)
     book_price: Decimal = Field(sa_type=Numeric(5, 2))
     book_cover_photo: Optional[str] = Field(default=None, max_length=100)
 
-
+# Full-text search document of a book, the query must use the same expression as the index
+SEARCH_CONFIG = text("'english'")
+book_search_vector = func.to_tsvector(
+    SEARCH_CONFIG,
+    func.coalesce(Book.__table__.c.book_title, text("''"))
+    .op("||")(text("' '"))
+    .op("||")(func.coalesce(Book.__table__.c.book_summary, text("''")))
+)
+Index("ix_book_search", book_search_vector, postgresql_using="gin").ddl_if(dialect="postgresql")
@@ -0,0 +1,21 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Float, Index
+
+class BookStats(SQLModel, table=True):
+    """Review statistics per book, kept in sync by the review write paths."""
+
+    __tablename__ = "book_stats"
+
+    book_id: int = Field(sa_type=BigInteger, primary_key=True, foreign_key="book.id")
+    review_count: int = Field(default=0)
+    rating_sum: int = Field(default=0)
+    avg_rating: Optional[float] = Field(sa_type=Float, default=None)
+    star_1: int = Field(default=0)
+    star_2: int = Field(default=0)
+    star_3: int = Field(default=0)
+    star_4: int = Field(default=0)
+    star_5: int = Field(default=0)
+
+# Backs the min_rating filter of the book listing
+Index("ix_book_stats_avg_rating", BookStats.avg_rating, BookStats.book_id)
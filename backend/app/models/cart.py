@@ -0,0 +1,15 @@
+from zoneinfo import ZoneInfo
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, SmallInteger
+import sqlalchemy as sa
+
+class CartItem(SQLModel, table=True):
+    """Quantity of a book in a user's cart, one row per cart line."""
+
+    __tablename__ = "cart_item"
+
+    user_id: int = Field(sa_type=BigInteger, primary_key=True, foreign_key="user.id")
+    book_id: int = Field(sa_type=BigInteger, primary_key=True, foreign_key="book.id")
+    quantity: int = Field(sa_type=SmallInteger)
+    updated_at: datetime = Field(sa_column=sa.Column(sa.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(ZoneInfo("UTC"))))
@@ -1,6 +1,6 @@
 from decimal import Decimal
 from sqlmodel import Numeric, SQLModel, Field
-from sqlalchemy import BigInteger
+from sqlalchemy import BigInteger, Index
 from typing import Optional
 from datetime import date
 
@@ -9,4 +9,7 @@ class Discount(SQLModel, table=True):
     book_id: Optional[int] = Field(sa_type=BigInteger, foreign_key="book.id")
     discount_start_date: date
     discount_end_date: Optional[date] = None
-    discount_price: Decimal = Field(sa_type=Numeric(5, 2))
\ No newline at end of file
+    discount_price: Decimal = Field(sa_type=Numeric(5, 2))
+
+# Active discounts are looked up per book by date range
+Index("ix_discount_book_id_dates", Discount.book_id, Discount.discount_start_date, Discount.discount_end_date)
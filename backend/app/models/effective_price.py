@@ -0,0 +1,19 @@
+from decimal import Decimal
+from typing import Optional
+from sqlmodel import Numeric, SQLModel, Field
+from sqlalchemy import BigInteger, Index
+
+class EffectivePrice(SQLModel, table=True):
+    """Price a book sells for today, refreshed when discounts change and at every day boundary."""
+
+    __tablename__ = "effective_price"
+
+    book_id: int = Field(sa_type=BigInteger, primary_key=True, foreign_key="book.id")
+    discount_id: Optional[int] = Field(sa_type=BigInteger, default=None, foreign_key="discount.id")
+    final_price: Decimal = Field(sa_type=Numeric(5, 2))
+    # Money saved by the active discount, 0 when the book is not on sale
+    sub_price: Decimal = Field(sa_type=Numeric(5, 2))
+
+# Match the price and on-sale sort orders of the book listing
+Index("ix_effective_price_final_price", EffectivePrice.final_price, EffectivePrice.book_id)
+Index("ix_effective_price_onsale", EffectivePrice.sub_price.desc(), EffectivePrice.final_price, EffectivePrice.book_id)
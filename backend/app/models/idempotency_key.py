@@ -0,0 +1,20 @@
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import JSON, BigInteger
+import sqlalchemy as sa
+
+class IdempotencyKey(SQLModel, table=True):
+    """Response of a request sent with an Idempotency-Key header, replayed on retries."""
+
+    __tablename__ = "idempotency_key"
+
+    user_id: int = Field(sa_type=BigInteger, primary_key=True, foreign_key="user.id")
+    key: str = Field(primary_key=True, max_length=255)
+    # Hash of the request body, a key cannot be reused for a different request
+    request_hash: str = Field(max_length=64)
+    # Both stay empty while the first request is still running
+    status_code: Optional[int] = Field(default=None)
+    response: Optional[Any] = Field(sa_type=JSON, default=None)
+    created_at: datetime = Field(sa_column=sa.Column(sa.DateTime(timezone=True), nullable=False, index=True, default=lambda: datetime.now(ZoneInfo("UTC"))))
@@ -1,7 +1,7 @@
 from decimal import Decimal
 from sqlmodel import Numeric, SQLModel, Field
 from typing import Optional
-from sqlalchemy import BigInteger, SmallInteger, Column
+from sqlalchemy import BigInteger, Index, SmallInteger, Column
 from datetime import datetime
 
 
@@ -11,9 +11,12 @@ class Order(SQLModel, table=True):
     order_date: datetime = Field(default_factory=datetime.now)
     order_amount: Decimal = Field(sa_type=Numeric(8, 2))
 
+# Order history of a user, newest first, paged by (order_date, id)
+Index("ix_order_user_id_order_date", Order.user_id, Order.order_date, Order.id)
+
 class OrderItem(SQLModel, table=True):
     id: Optional[int] = Field(sa_type=BigInteger, default=None, primary_key=True)
-    order_id: Optional[int] = Field(sa_type=BigInteger, foreign_key="order.id")
+    order_id: Optional[int] = Field(sa_type=BigInteger, foreign_key="order.id", index=True)
     book_id: Optional[int] = Field(sa_type=BigInteger, foreign_key="book.id")
     quantity: int = Field(sa_type=SmallInteger)
     price: Decimal = Field(sa_type=Numeric(5, 2))
\ No newline at end of file
@@ -1,6 +1,6 @@
 from zoneinfo import ZoneInfo
 from sqlmodel import SQLModel, Field
-from sqlalchemy import BigInteger, Text
+from sqlalchemy import BigInteger, Index, Text
 import sqlalchemy as sa
 from typing import Optional
 from datetime import datetime
@@ -12,3 +12,7 @@ class Review(SQLModel, table=True):
     review_details: Optional[str] = Field(sa_type=Text, default=None)
     review_date: datetime = Field(sa_column=sa.Column(sa.DateTime(timezone=True), default=lambda: datetime.now(ZoneInfo("UTC"))))
     rating_star: int = Field(max_length=5)
+
+# Reviews are always read per book, optionally by star, and paged by (review_date, id)
+Index("ix_review_book_id_review_date", Review.book_id, Review.review_date, Review.id)
+Index("ix_review_book_id_rating_star", Review.book_id, Review.rating_star, Review.review_date, Review.id)
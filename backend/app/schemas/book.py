@@ -16,6 +16,14 @@ class BookCreate(Book):
     """Schema for creating a book."""
     pass
 
+class BookBulkRow(BookCreate):
+    """Row of a bulk book write, a row with an id replaces that book."""
+    id: Optional[int] = None
+    # Column limits, so a bad row fails validation instead of its whole chunk
+    book_title: str = Field(default="Book Title", max_length=255)
+    book_price: float = Field(default=0, ge=0, lt=1000)
+    book_cover_photo: Optional[str] = Field(default="", max_length=100)
+
 class BookUpdate(SQLModel):
     """Schema for updating a book."""
     category_id: Optional[int] = None
@@ -30,7 +38,14 @@ class BookRead(Book):
     category_id: Optional[int] = None
     author_id: Optional[int] = None
     avg_rating: Optional[float] = None
+    review_count: int = 0
 
 class BookReadWithDetails(BookRead):
     authors: List[AuthorRead] = []
-    discount: Optional[DiscountRead] = None
\ No newline at end of file
+    discount: Optional[DiscountRead] = None
+
+class HomeShelves(SQLModel):
+    """Book shelves of the home page."""
+    onsale: List[BookRead] = []
+    recommended: List[BookRead] = []
+    popular: List[BookRead] = []
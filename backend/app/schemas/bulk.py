@@ -0,0 +1,16 @@
+from typing import List, Optional
+from sqlmodel import SQLModel
+
+
+class BulkRowError(SQLModel):
+    """A row of a bulk request that was not written."""
+    index: int
+    errors: List[str]
+
+class BulkResult(SQLModel):
+    """Outcome of a bulk write, `ids` holds the id written for each row index."""
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    ids: List[Optional[int]] = []
+    errors: List[BulkRowError] = []
@@ -0,0 +1,23 @@
+from typing import List, Optional
+from sqlmodel import SQLModel
+
+class CartQuoteLine(SQLModel):
+    """Schema for one priced cart line."""
+    book_id: int
+    book_title: str
+    book_cover_photo: Optional[str] = None
+    author_name: Optional[str] = None
+    quantity: int
+    book_price: float
+    final_price: float
+    line_total: float
+    line_savings: float
+
+class CartQuote(SQLModel):
+    """Schema for a cart priced the way place_order charges it."""
+    items: List[CartQuoteLine] = []
+    subtotal: float
+    savings: float
+    total: float
+    # Books that were removed from the catalog since they were added to the cart
+    unavailable_book_ids: List[int] = []
@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from sqlmodel import SQLModel, Field
 from typing import Optional
 from datetime import date
@@ -11,6 +12,19 @@ class DiscountBase(SQLModel):
 class DiscountCreate(DiscountBase):
     pass
 
+class DiscountBulkRow(DiscountBase):
+    """Row of a bulk discount write, a row with an id replaces that discount."""
+    id: Optional[int] = None
+    book_id: int
+    discount_end_date: Optional[date] = None
+    discount_price: float = Field(gt=0, lt=1000)
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.discount_end_date is not None and self.discount_end_date < self.discount_start_date:
+            raise ValueError("discount_end_date is before discount_start_date")
+        return self
+
 class DiscountUpdate(DiscountBase):
     pass
 
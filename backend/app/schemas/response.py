@@ -1,9 +1,16 @@
-from typing import List
+from typing import List, Optional
 from sqlmodel import SQLModel
 
+from app.schemas.order import OrderWithItems
 from app.schemas.review import ReviewRead
 
 
 class ReviewsResponse(SQLModel):
     items: List[ReviewRead]
-    total: int
\ No newline at end of file
+    total: int
+    next_cursor: Optional[str] = None
+
+
+class OrdersResponse(SQLModel):
+    items: List[OrderWithItems]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 from sqlmodel import SQLModel, Field
 from pydantic import BaseModel
 
@@ -23,6 +23,13 @@ class RatingRead(SQLModel):
     rating_star: int
     review_count: int
 
+class BookRatingSummary(SQLModel):
+    """Schema for the rating summary of a book."""
+    book_id: int
+    avg_rating: Optional[float] = None
+    review_count: int = 0
+    ratings: List[RatingRead] = []
+
 class ReviewRead(ReviewBase):
     """Schema for reading a review."""
     id: int
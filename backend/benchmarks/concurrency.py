@@ -0,0 +1,62 @@
+"""Measure API throughput under parallel load.
+
+Run it against a running server, once before and once after a change:
+
+    uv run python -m benchmarks.concurrency --url http://localhost:8000 --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/routers/books/?sort_by=onsale&limit=20",
+    "/api/routers/books/?sort_by=popular&limit=20&total=none",
+    "/api/routers/books/1",
+    "/api/routers/reviews/ratings/1",
+    "/api/routers/categories/",
+]
+
+async def worker(client: httpx.AsyncClient, paths, queue: asyncio.Queue, latencies, errors):
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        path = paths[index % len(paths)]
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as error:
+            errors.append(type(error).__name__)
+        latencies.append(time.perf_counter() - started)
+
+async def run(url: str, paths, concurrency: int, requests: int):
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(index)
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, paths, queue, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"requests:    {len(latencies)} ({len(errors)} errors) with concurrency {concurrency}")
+    print(f"throughput:  {len(latencies) / elapsed:.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"latency max: {latencies[-1] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint to hit, repeatable")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.paths or DEFAULT_PATHS, args.concurrency, args.requests))
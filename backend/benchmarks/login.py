@@ -0,0 +1,68 @@
+"""Measure login throughput and its effect on concurrent browse traffic.
+
+Runs login requests and catalog reads side by side against a running
+server, then reports both, so bcrypt stalling the event loop shows up as
+browse latency:
+
+    uv run python -m benchmarks.login --url http://localhost:8000 --email admin@example.com --password secret
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+BROWSE_PATH = "/api/routers/books/?sort_by=onsale&limit=20"
+
+def summary(name: str, latencies, statuses, elapsed: float):
+    latencies = sorted(latencies)
+    failures = sum(1 for status in statuses if status >= 400)
+    print(
+        f"{name:<7} {len(latencies):>6} req {len(latencies) / elapsed:>8.1f} req/s "
+        f"p50 {statistics.median(latencies) * 1000:>7.1f} ms "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:>7.1f} ms "
+        f"({failures} failed)"
+    )
+
+async def login_worker(client: httpx.AsyncClient, email: str, password: str, deadline: float, latencies, statuses):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/api/routers/auth/login", data={"username": email, "password": password})
+        latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+
+async def browse_worker(client: httpx.AsyncClient, deadline: float, latencies, statuses):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(BROWSE_PATH)
+        latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+
+async def run(url: str, email: str, password: str, logins: int, browsers: int, seconds: float):
+    limits = httpx.Limits(max_connections=logins + browsers)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        login_latencies, login_statuses, browse_latencies, browse_statuses = [], [], [], []
+        started = time.perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(
+            *(login_worker(client, email, password, deadline, login_latencies, login_statuses) for _ in range(logins)),
+            *(browse_worker(client, deadline, browse_latencies, browse_statuses) for _ in range(browsers)),
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"{logins} concurrent logins, {browsers} concurrent browsers, {seconds:.0f} s")
+    if login_latencies:
+        summary("login", login_latencies, login_statuses, elapsed)
+    if browse_latencies:
+        summary("browse", browse_latencies, browse_statuses, elapsed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=8, help="Concurrent login clients")
+    parser.add_argument("--browsers", type=int, default=32, help="Concurrent browse clients")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.email, args.password, args.logins, args.browsers, args.seconds))
@@ -0,0 +1,54 @@
+"""Measure order placement latency and query count against basket size.
+
+Runs place_order in process against DATABASE_URL inside a transaction that
+is rolled back, so no orders are left behind (needs Postgres, pysqlite does
+not roll back savepoints released outside an explicit BEGIN):
+
+    uv run python -m benchmarks.order_placement --sizes 1 5 10 20 50 --repeat 50
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from sqlmodel import Session, select
+
+from app.crud.order import place_order
+from app.db.database import engine
+from app.db.instrumentation import QueryStats, _request_stats
+from app.models.book import Book
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderItemCreate
+
+def run(sizes, repeat: int):
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        # place_order commits, release a savepoint instead of the outer transaction
+        with Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False) as session:
+            user = session.exec(select(User)).first()
+            book_ids = session.exec(select(Book.id).order_by(Book.id).limit(max(sizes))).all()
+            if user is None or len(book_ids) < max(sizes):
+                raise SystemExit(f"Needs a user and at least {max(sizes)} books, run populate_db.py first")
+
+            print(f"{'items':>6} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8}")
+            for size in sizes:
+                items = [OrderItemCreate(book_id=book_id, quantity=1, price=0) for book_id in book_ids[:size]]
+                latencies = []
+                for _ in range(repeat):
+                    order_create = OrderCreate(order_date=datetime.now(), order_amount=0, items=items)
+                    stats = QueryStats()
+                    token = _request_stats.set(stats)
+                    started = time.perf_counter()
+                    place_order(session, order_create, user)
+                    latencies.append(time.perf_counter() - started)
+                    _request_stats.reset(token)
+                latencies.sort()
+                p95 = latencies[int(len(latencies) * 0.95) - 1]
+                print(f"{size:>6} {stats.count:>8} {statistics.median(latencies) * 1000:>8.2f} {p95 * 1000:>8.2f}")
+        transaction.rollback()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,96 @@
+"""Measure the cost of turning list pages into JSON, per item, before and after the fast path.
+
+Loads pages of books, reviews, authors and discounts from the configured
+database and times how long building and encoding the response body takes:
+
+  before  rows validated into the response models, then jsonable_encoder or
+          response model serialization and the stdlib JSON encoder
+  after   rows built with from_row and encoded by FastJSONResponse
+
+    uv run python -m benchmarks.serialization --sizes 20 100
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlmodel import Session, select
+
+from app.core.responses import FastJSONResponse, from_row, orjson
+from app.crud.book import BooksResponse
+from app.db.database import engine
+from app.models.author import Author
+from app.models.book import Book
+from app.models.book_stats import BookStats
+from app.models.discount import Discount
+from app.models.review import Review
+from app.schemas.book import BookRead
+from app.schemas.response import ReviewsResponse
+from app.schemas.review import ReviewRead
+
+def per_item_us(build: Callable[[], bytes], items: int, repeat: int) -> float:
+    build()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    return (time.perf_counter() - started) / repeat / items * 1_000_000
+
+def response_model_body(schema, rows) -> bytes:
+    """What a route with response_model=List[schema] did: validate, serialize, encode."""
+    adapter = TypeAdapter(List[schema])
+    return JSONResponse(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")).body
+
+def scenarios(session: Session, size: int):
+    rows = session.exec(
+        select(Book, BookStats.avg_rating, BookStats.review_count).outerjoin(BookStats).limit(size)
+    ).all()
+    yield "books", len(rows), (
+        lambda: JSONResponse(jsonable_encoder(BooksResponse(items=[
+            BookRead.model_validate(book, update={"avg_rating": avg_rating, "review_count": review_count or 0})
+            for book, avg_rating, review_count in rows
+        ], total=size))).body
+    ), (
+        lambda: FastJSONResponse(BooksResponse(items=[
+            from_row(BookRead, book, book_price=float(book.book_price), avg_rating=avg_rating, review_count=review_count or 0)
+            for book, avg_rating, review_count in rows
+        ], total=size)).body
+    )
+
+    book_id = session.exec(select(BookStats.book_id).order_by(BookStats.review_count.desc())).first()
+    reviews = session.exec(select(Review).where(Review.book_id == book_id).limit(size)).all()
+    yield "reviews", len(reviews), (
+        lambda: JSONResponse(jsonable_encoder(ReviewsResponse(items=reviews, total=size))).body
+    ), (
+        lambda: FastJSONResponse(ReviewsResponse(items=[from_row(ReviewRead, review) for review in reviews], total=size)).body
+    )
+
+    for model in (Author, Discount):
+        found = session.exec(select(model).limit(size)).all()
+        yield model.__tablename__, len(found), (
+            lambda found=found, model=model: response_model_body(model, found)
+        ), (
+            lambda found=found: FastJSONResponse(found).body
+        )
+
+def main(sizes: List[int], repeat: int):
+    print(f"orjson {'installed' if orjson else 'not installed'}, microseconds per item")
+    print(f"{'page':<10} {'items':>6} {'before':>9} {'after':>9} {'speedup':>8}")
+    with Session(engine) as session:
+        for size in sizes:
+            for name, items, before, after in scenarios(session, size):
+                if not items:
+                    print(f"{name:<10} {'no rows':>6}")
+                    continue
+                assert json.loads(before()) == json.loads(after()), f"{name} bodies differ"
+                before_us = per_item_us(before, items, repeat)
+                after_us = per_item_us(after, items, repeat)
+                print(f"{name:<10} {items:>6} {before_us:>9.2f} {after_us:>9.2f} {before_us / after_us:>7.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
@@ -0,0 +1,222 @@
+"""Generate a synthetic, referentially consistent catalog at a given scale.
+
+Every table grows linearly with --scale (scale 1 is 10k books and 100k
+reviews, scale 10 gives a million reviews). The same --seed always gives
+the same data, with dates relative to today. Rows are streamed in batches through COPY on Postgres and
+executemany elsewhere, then book_stats and effective_price are rebuilt:
+
+    uv run python generate_data.py --scale 10 --seed 42 --reset
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence, Tuple
+from faker import Faker
+from passlib.context import CryptContext
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from app.crud.book_stats import rebuild_book_stats
+from app.crud.effective_price import refresh_effective_prices
+from app.db.database import engine
+from app.models.author import Author
+from app.models.book import Book
+from app.models.book_stats import BookStats
+from app.models.cart import CartItem
+from app.models.category import Category
+from app.models.discount import Discount
+from app.models.effective_price import EffectivePrice
+from app.models.idempotency_key import IdempotencyKey
+from app.models.order import Order, OrderItem
+from app.models.review import Review
+from app.models.user import User
+
+# Rows per table at scale 1
+BASE_COUNTS = {
+    "categories": 20,
+    "authors": 1_000,
+    "books": 10_000,
+    "users": 1_000,
+    "reviews": 100_000,
+    "orders": 20_000,
+}
+
+# Children first, so deleting in this order never breaks a foreign key
+TABLES = [
+    CartItem, IdempotencyKey, OrderItem, Order, Review, BookStats, EffectivePrice,
+    Discount, Book, Author, Category, User,
+]
+
+# Every generated user logs in with this password
+USER_PASSWORD = "password123"
+
+def scaled(name: str, scale: float) -> int:
+    return max(1, round(BASE_COUNTS[name] * scale))
+
+def batched(rows: Iterable[Sequence], size: int) -> Iterator[List[Sequence]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def copy_rows(connection: Connection, table: Table, columns: Sequence[str], batch: List[Sequence]):
+    """Load a batch with Postgres COPY, an order of magnitude faster than INSERT."""
+    buffer = io.StringIO()
+    # Empty unquoted fields are NULL for COPY ... CSV
+    csv.writer(buffer).writerows(batch)
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    cursor.copy_expert(f'COPY "{table.name}" ({quoted}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+def load(connection: Connection, model, columns: Sequence[str], rows: Iterable[Sequence], batch_size: int) -> int:
+    """Stream rows into a table in batches and return how many were loaded."""
+    table = model.__table__
+    use_copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+    count = 0
+    started = time.perf_counter()
+    for batch in batched(rows, batch_size):
+        if use_copy:
+            copy_rows(connection, table, columns, batch)
+        else:
+            connection.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+        count += len(batch)
+    print(f"{table.name:<16} {count:>10} rows in {time.perf_counter() - started:6.1f} s")
+    return count
+
+def reset(connection: Connection):
+    """Delete every row of the catalog, order and user tables."""
+    if connection.dialect.name == "postgresql":
+        names = ", ".join(f'"{model.__table__.name}"' for model in TABLES)
+        connection.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for model in TABLES:
+            connection.execute(model.__table__.delete())
+
+def sync_sequences(connection: Connection):
+    """Move the id sequences past the explicit ids we inserted (Postgres only)."""
+    if connection.dialect.name != "postgresql":
+        return
+    for model in (Category, Author, Book, Discount, User, Review, Order, OrderItem):
+        table = model.__table__.name
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), COALESCE(MAX(id), 1)) FROM \"{table}\""
+        ))
+
+def generate(scale: float, seed: int, batch_size: int, do_reset: bool):
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+    # Reviews and summaries draw from a fixed vocabulary, Faker is too slow for millions of rows
+    vocabulary = [fake.word() for _ in range(2_000)]
+
+    def sentence(words: int) -> str:
+        return " ".join(rng.choices(vocabulary, k=words)).capitalize()
+
+    counts = {name: scaled(name, scale) for name in BASE_COUNTS}
+    today = date.today()
+    now = datetime.now(timezone.utc)
+
+    with engine.begin() as connection:
+        if do_reset:
+            reset(connection)
+        elif connection.execute(select(func.count()).select_from(Book.__table__)).scalar():
+            raise SystemExit("The database already has books, pass --reset to replace them")
+
+        load(connection, Category, ["id", "category_name", "category_desc"], (
+            (i, f"{fake.word().capitalize()} {i}", sentence(8))
+            for i in range(1, counts["categories"] + 1)
+        ), batch_size)
+
+        load(connection, Author, ["id", "author_name", "author_bio"], (
+            (i, fake.name(), sentence(20))
+            for i in range(1, counts["authors"] + 1)
+        ), batch_size)
+
+        # Keep prices to generate discounts and orders consistent with them
+        prices = [Decimal(rng.randrange(500, 9_999)) / 100 for _ in range(counts["books"])]
+        load(connection, Book, ["id", "category_id", "author_id", "book_title", "book_summary", "book_price", "book_cover_photo"], (
+            (
+                i,
+                rng.randint(1, counts["categories"]),
+                rng.randint(1, counts["authors"]),
+                sentence(rng.randint(1, 5)),
+                sentence(rng.randint(20, 60)),
+                prices[i - 1],
+                f"https://picsum.photos/seed/book{i}/320/480",
+            )
+            for i in range(1, counts["books"] + 1)
+        ), batch_size)
+
+        # A quarter of the books have a discount: most running, some expired, some upcoming
+        def discounts() -> Iterator[Tuple]:
+            discount_id = 0
+            for book_id in range(1, counts["books"] + 1):
+                if rng.random() >= 0.25:
+                    continue
+                discount_id += 1
+                start = today + timedelta(days=rng.randint(-60, 10))
+                end = None if rng.random() < 0.3 else start + timedelta(days=rng.randint(1, 90))
+                price = (prices[book_id - 1] * Decimal(rng.uniform(0.5, 0.95))).quantize(Decimal("0.01"))
+                yield discount_id, book_id, start, end, price
+        load(connection, Discount, ["id", "book_id", "discount_start_date", "discount_end_date", "discount_price"], discounts(), batch_size)
+
+        # Hashing is the slow part of creating users, every user shares one hash
+        password = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(USER_PASSWORD)
+        load(connection, User, ["id", "first_name", "last_name", "email", "admin", "password"], (
+            (i, fake.first_name(), fake.last_name(), f"user{i}@example.com", False, password)
+            for i in range(1, counts["users"] + 1)
+        ), batch_size)
+
+        # Popular books get most of the reviews, like in production
+        def popular_book() -> int:
+            return 1 + int(counts["books"] * rng.random() ** 3)
+
+        load(connection, Review, ["id", "book_id", "review_title", "review_details", "review_date", "rating_star"], (
+            (
+                i,
+                popular_book(),
+                sentence(rng.randint(2, 6)),
+                sentence(rng.randint(10, 80)),
+                now - timedelta(seconds=rng.randint(0, 3 * 365 * 86400)),
+                rng.choices((1, 2, 3, 4, 5), weights=(5, 7, 15, 33, 40))[0],
+            )
+            for i in range(1, counts["reviews"] + 1)
+        ), batch_size)
+
+        # Build orders and their items together so the amounts add up
+        orders, items = [], []
+        for order_id in range(1, counts["orders"] + 1):
+            amount = Decimal(0)
+            for book_id in rng.sample(range(1, counts["books"] + 1), rng.randint(1, min(5, counts["books"]))):
+                quantity = rng.randint(1, 3)
+                amount += quantity * prices[book_id - 1]
+                items.append((len(items) + 1, order_id, book_id, quantity, prices[book_id - 1]))
+            order_date = (now - timedelta(seconds=rng.randint(0, 365 * 86400))).replace(tzinfo=None)
+            orders.append((order_id, rng.randint(1, counts["users"]), order_date, amount))
+        load(connection, Order, ["id", "user_id", "order_date", "order_amount"], orders, batch_size)
+        load(connection, OrderItem, ["id", "order_id", "book_id", "quantity", "price"], items, batch_size)
+
+        sync_sequences(connection)
+
+    # Derived tables, built the same way the app maintains them
+    with Session(engine) as session:
+        started = time.perf_counter()
+        rebuild_book_stats(session)
+        refresh_effective_prices(session)
+        session.commit()
+        print(f"{'derived tables':<16} {'':>10}      in {time.perf_counter() - started:6.1f} s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor, 1 = 10k books and 100k reviews")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="Delete existing catalog, order and user rows first")
+    args = parser.parse_args()
+    generate(args.scale, args.seed, args.batch_size, args.reset)
@@ -0,0 +1,14 @@
+from sqlmodel import Session
+from app.db.database import engine
+from app.crud.book_stats import rebuild_book_stats
+
+
+def main():
+    with Session(engine) as session:
+        total = rebuild_book_stats(session)
+        print(f"Rebuilt review stats for {total} books")
+
+
+if __name__ == "__main__":
+    # Backfill book_stats from the review table
+    main()
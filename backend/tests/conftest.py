@@ -0,0 +1,13 @@
+import os
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+# Settings are read on import of the app, the tests bring their own database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("FIRST_SUPERUSER", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "admin")
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite only autoincrements an INTEGER PRIMARY KEY, the test schemas come from create_all
+    return "INTEGER"
@@ -0,0 +1,94 @@
+"""An Idempotency-Key places at most one order, whether retries race it or take it over."""
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from app.core.config import settings
+from app.crud.idempotency_key import claim_idempotency_key, release_idempotency_key
+from app.crud.order import place_order
+from app.models.author import Author
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.schemas.order import OrderCreate
+
+KEY = "order-1"
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file, so every thread gets its own connection to the same database
+    engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}", connect_args={"timeout": 30})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, first_name="Ada", last_name="Reader", email="ada@example.com", password="x"))
+        session.add(Author(id=1, author_name="Author"))
+        session.add(Book(id=1, author_id=1, book_title="Book", book_price=Decimal("12.50")))
+        session.commit()
+    return engine
+
+@pytest.fixture
+def user(engine):
+    with Session(engine) as session:
+        return session.get(User, 1)
+
+def order_create(book_id: int = 1) -> OrderCreate:
+    return OrderCreate.model_validate({
+        "order_date": "2026-10-19T00:00:00", "order_amount": 0, "items": [{"book_id": book_id, "quantity": 2, "price": 0}]
+    })
+
+def submit(engine, user, book_id: int = 1):
+    """What the order route does with a key: claim it, then place the order or return the earlier record."""
+    with Session(engine) as session:
+        record, claimed = claim_idempotency_key(session, user.id, KEY, "hash")
+        if not claimed:
+            return record.status_code
+        try:
+            place_order(session, order_create(book_id), user, idempotency_claim=record)
+        except BaseException:
+            release_idempotency_key(session, record)
+            raise
+        return "placed"
+
+def order_count(engine) -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(Order)).one()
+
+def test_concurrent_retries_place_one_order(engine, user):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: submit(engine, user), range(8)))
+    assert results.count("placed") == 1
+    assert order_count(engine) == 1
+    # Later retries replay the stored response
+    assert submit(engine, user) == 201
+
+def test_taken_over_claim_cannot_place_its_order(engine, user, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0)
+    with Session(engine) as slow, Session(engine) as retry:
+        first, claimed = claim_idempotency_key(slow, user.id, KEY, "hash")
+        assert claimed
+        # The first request is past its lease, a retry takes the key over and places the order
+        second, claimed = claim_idempotency_key(retry, user.id, KEY, "hash")
+        assert claimed
+        place_order(retry, order_create(), user, idempotency_claim=second)
+
+        with pytest.raises(HTTPException) as raised:
+            place_order(slow, order_create(), user, idempotency_claim=first)
+        assert raised.value.status_code == 409
+        release_idempotency_key(slow, first)
+
+    assert order_count(engine) == 1
+    assert submit(engine, user) == 201
+
+def test_finished_claim_is_replayed_after_the_lease(engine, user, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0)
+    assert submit(engine, user) == "placed"
+    assert submit(engine, user) == 201
+    assert order_count(engine) == 1
+
+def test_failed_request_releases_its_key(engine, user):
+    with pytest.raises(HTTPException):
+        submit(engine, user, book_id=999)
+    assert order_count(engine) == 0
+    assert submit(engine, user) == "placed"
@@ -0,0 +1,37 @@
+"""Cursors only decode to values that can be compared with their sort keys."""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_predicate
+from app.models.review import Review
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def test_cursor_round_trips():
+    values = [Decimal("35.31"), 4.5, 7, "title", datetime(2026, 10, 18, 12, 30)]
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+@pytest.mark.parametrize("values", [
+    [{"z": 1}, 1],
+    [[1], 1],
+    [None, 1],
+    [True, 1],
+    [{"d": "abc"}, 1],
+    [1],
+], ids=["unknown_object", "list", "null", "bool", "bad_decimal", "wrong_size"])
+def test_malformed_cursor_is_rejected(values):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(raw_cursor(values), 2)
+    assert raised.value.status_code == 400
+
+@pytest.mark.parametrize("values", [["2026-10-18", 1], [{"t": "2026-10-18T00:00:00"}, "1"]], ids=["date_as_string", "id_as_string"])
+def test_cursor_value_must_fit_its_sort_key(values):
+    keys = [(Review.review_date, True), (Review.id, True)]
+    with pytest.raises(HTTPException) as raised:
+        keyset_predicate(keys, decode_cursor(raw_cursor(values), 2))
+    assert raised.value.status_code == 400
@@ -0,0 +1,66 @@
+"""The hot catalog and review queries must be served by indexes, not full table scans."""
+import re
+from typing import Callable, List
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.crud.book import get_books
+from app.crud.review import get_reviews
+
+SORT_MODES = ["onsale", "recommended", "popular", "price_asc", "price_desc"]
+# A bare SCAN reads every row of the table, SCAN ... USING INDEX walks an index in order
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+def query_plans(engine, run: Callable[[Session], object]) -> List[List[str]]:
+    """Run a crud function and return the EXPLAIN QUERY PLAN of every SELECT it sent."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as session:
+            run(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    with engine.connect() as connection:
+        return [
+            [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            for statement, parameters in statements
+        ]
+
+def full_scans(plans: List[List[str]]) -> List[str]:
+    return [match.group(1) for plan in plans for line in plan if (match := FULL_SCAN.match(line))]
+
+@pytest.mark.parametrize("sort_by", SORT_MODES)
+@pytest.mark.parametrize("filters", [{"category_id": 1}, {"author_id": 1}, {"min_rating": 3}], ids=["category", "author", "min_rating"])
+def test_filtered_book_listing_uses_indexes(engine, sort_by, filters):
+    plans = query_plans(engine, lambda session: get_books.__wrapped__(session, 0, 20, sort_by, **filters))
+    assert plans
+    assert full_scans(plans) == []
+
+# The other sorts read every book of an unfiltered listing by design
+@pytest.mark.parametrize("sort_by", ["onsale", "price_asc", "price_desc"])
+def test_unfiltered_book_listing_walks_price_index(engine, sort_by):
+    plans = query_plans(engine, lambda session: get_books.__wrapped__(session, 0, 20, sort_by, total="none"))
+    assert full_scans(plans) == []
+    assert any("USING COVERING INDEX ix_effective_price" in line for plan in plans for line in plan)
+
+@pytest.mark.parametrize("sort_by", ["newest to oldest", "oldest to newest"])
+@pytest.mark.parametrize("rating", [0, 4], ids=["all_stars", "star_filter"])
+def test_reviews_use_indexes(engine, sort_by, rating):
+    plans = query_plans(engine, lambda session: get_reviews(session, 1, rating, sort_by))
+    assert plans
+    assert full_scans(plans) == []
+    expected_index = "ix_review_book_id_rating_star" if rating else "ix_review_book_id_review_date"
+    assert any(expected_index in line for line in plans[0])